@@ -0,0 +1,43 @@
+"""add_embedding_cache_table
+
+Revision ID: 5b1e7c2d9a40
+Revises: 082939899ed2
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e7c2d9a40"
+down_revision: Union[str, None] = "082939899ed2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            content_hash BYTEA NOT NULL,
+            model TEXT NOT NULL,
+            embedding VECTOR NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            last_used_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (content_hash, model)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used_at
+        ON embedding_cache (last_used_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
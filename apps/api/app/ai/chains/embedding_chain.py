@@ -2,15 +2,38 @@
 Embedding chain using embedding tools for vector generation and storage.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from time import time as _time
+from typing import AsyncIterator, Dict, Any, List, Optional
+import orjson
 from langchain_core.documents import Document
 
-from app.ai.tools.embedding_tools import EmbeddingGenerationTool, EmbeddingAnalysisTool
-from app.ai.services.vector_service import VectorService
+from app.ai.tools.embedding_tools import (
+    EmbeddingAnalysisTool,
+    get_shared_embedding_tool,
+)
+from app.ai.services.vector_service import (
+    DEFAULT_STORE_BATCH_SIZE,
+    get_shared_vector_service,
+)
+from app.ai.services.embedding_cache_service import EmbeddingCacheService
 
 logger = logging.getLogger(__name__)
 
+# Texts per aembed_documents request; requests are issued concurrently
+EMBEDDING_BATCH_SIZE = 512
+
+# Metadata value types stored as-is; anything else is stringified
+_JSON_SAFE = (str, int, float, bool, type(None))
+
+# Above this many chunks, load via COPY and build the ANN index once at the end
+BULK_INGEST_THRESHOLD = 2000
+
+# Chunks embedded per window during a bulk load; windows are streamed into
+# COPY so only one window of vectors is held in memory at a time
+BULK_EMBEDDING_WINDOW = 4 * EMBEDDING_BATCH_SIZE
+
 
 class EmbeddingChain:
     """Chain for generating and storing embeddings using embedding tools."""
@@ -25,18 +48,47 @@ class EmbeddingChain:
             model: OpenAI embedding model to use
         """
         # TOOLS: For simple, stateless operations
-        self.embedding_tool = EmbeddingGenerationTool(model)
+        self.embedding_tool = get_shared_embedding_tool(model)
         self.analysis_tool = EmbeddingAnalysisTool()
 
         # SERVICE: For complex, stateful infrastructure (now with tool delegation)
-        self.vector_service = VectorService()
+        self.vector_service = get_shared_vector_service()
+        self.embedding_cache = EmbeddingCacheService(model)
 
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def process(
+        self, state: Dict[str, Any], batch_size: int = DEFAULT_STORE_BATCH_SIZE
+    ) -> Dict[str, Any]:
         """
         Process chunks through embedding generation and storage.
 
+        Runs aprocess on the shared background loop, so sync callers get the
+        same pooled writes and embedding cache as the async path.
+
+        Args:
+            state: Processing state containing chunks and project information
+            batch_size: Number of rows written per vector store upsert batch
+
+        Returns:
+            Updated state with embedding results
+        """
+        # Import here to avoid circular dependency
+        from app.ai.services.document_processing_service import run_sync
+
+        return run_sync(self.aprocess(state, batch_size))
+
+    async def aprocess(
+        self, state: Dict[str, Any], batch_size: int = DEFAULT_STORE_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Async variant of process.
+
+        Embeddings are computed in concurrent batches and handed to the
+        vector store, so each chunk is embedded exactly once. Large files are
+        embedded window by window and streamed into the bulk load.
+
         Args:
             state: Processing state containing chunks and project information
+            batch_size: Number of rows written per vector store upsert batch
 
         Returns:
             Updated state with embedding results
@@ -44,106 +96,300 @@ class EmbeddingChain:
         file_path = state.get("file_path", "unknown")
         resource_id = state.get("resource_id", "unknown")
         logger.info(
-            f"[EMBEDDING_CHAIN] Starting embedding processing for file {file_path}, resource {resource_id}"
+            f"[EMBEDDING_CHAIN] Starting async embedding processing for file {file_path}, resource {resource_id}"
         )
 
         try:
-            chunks = state.get("documents", [])
+            validation_error = self._validate_state(state)
+            if validation_error:
+                return validation_error
 
-            logger.info(
-                f"[EMBEDDING_CHAIN] Processing {len(chunks)} documents for embedding"
-            )
+            enhanced_chunks = self._enhance_state_chunks(state)
 
-            if not chunks:
-                logger.error(
-                    f"[EMBEDDING_CHAIN] No chunks provided for embedding file {file_path}"
-                )
-                return {
-                    "success": False,
-                    "error": "No chunks provided for embedding",
-                    "embeddings_stored": 0,
-                }
-
-            if not file_path:
-                logger.error(f"[EMBEDDING_CHAIN] No file_path provided")
-                return {
-                    "success": False,
-                    "error": "No file_path provided",
-                    "embeddings_stored": 0,
-                }
-
-            # Enhance chunk metadata with resource and file info
-            logger.info(
-                f"[EMBEDDING_CHAIN] Enhancing chunk metadata for file {file_path}"
+            return await self._astore_embedded(
+                state, enhanced_chunks, None, batch_size
             )
-            original_filename = state.get("file_metadata", {}).get("file_name", "unknown")
-            file_key = state.get("file_key", "unknown")
-            enhanced_chunks = self._enhance_chunk_metadata(
-                chunks, resource_id, original_filename, file_key
+
+        except Exception as e:
+            logger.error(
+                f"[EMBEDDING_CHAIN] Embedding processing failed for file {file_path}: {str(e)}",
+                exc_info=True,
             )
+            return {"success": False, "error": str(e), "embeddings_stored": 0}
 
-            # Store documents in vector database using VectorService (with proper table tracking)
-            logger.info(
-                f"[EMBEDDING_CHAIN] Storing {len(enhanced_chunks)} documents in vector database via VectorService"
+    async def aprocess_many(
+        self,
+        states: List[Dict[str, Any]],
+        batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Embed and store the chunks of several files in one pass.
+
+        Chunks of all files are embedded together so the embedding requests
+        are filled across file boundaries; each file is then stored in its
+        own resource collection concurrently.
+
+        Args:
+            states: Processing states, each containing chunks and file information
+            batch_size: Number of rows written per vector store upsert batch
+
+        Returns:
+            One embedding result per state, in the same order
+        """
+        logger.info(
+            f"[EMBEDDING_CHAIN] Starting batched embedding processing for {len(states)} files"
+        )
+
+        results: List[Optional[Dict[str, Any]]] = [
+            self._validate_state(state) for state in states
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        try:
+            chunk_lists = [self._enhance_state_chunks(states[i]) for i in pending]
+            all_chunks = [chunk for chunks in chunk_lists for chunk in chunks]
+            all_embeddings = await self.aembed_chunks(all_chunks)
+        except Exception as e:
+            logger.error(
+                f"[EMBEDDING_CHAIN] Batched embedding failed: {str(e)}", exc_info=True
             )
-            storage_result = self.vector_service.store_documents(
-                enhanced_chunks, resource_id
+            for i in pending:
+                results[i] = {"success": False, "error": str(e), "embeddings_stored": 0}
+            return results
+
+        store_tasks = []
+        offset = 0
+        for i, chunks in zip(pending, chunk_lists):
+            embeddings = all_embeddings[offset : offset + len(chunks)]
+            offset += len(chunks)
+            store_tasks.append(
+                self._astore_embedded(states[i], chunks, embeddings, batch_size)
             )
 
-            if not storage_result["success"]:
+        stored = await asyncio.gather(*store_tasks, return_exceptions=True)
+        for i, result in zip(pending, stored):
+            if isinstance(result, BaseException):
                 logger.error(
-                    f"[EMBEDDING_CHAIN] Failed to store embeddings for file {file_path}: {storage_result['error'] or 'Unknown error'}"
+                    f"[EMBEDDING_CHAIN] Embedding processing failed for file {states[i].get('file_path', 'unknown')}: {str(result)}",
+                    exc_info=result,
                 )
-                return {
-                    "success": False,
-                    "error": f"Failed to store documents in vector database: {storage_result['error'] or 'Unknown error'}",
-                    "embeddings_stored": 0,
-                }
+                result = {"success": False, "error": str(result), "embeddings_stored": 0}
+            results[i] = result
 
-            logger.info(
-                f"[EMBEDDING_CHAIN] Successfully stored {storage_result['document_count']} embeddings"
-            )
+        return results
 
-            # TOOL USAGE: Generate embeddings for analysis (sample)
-            logger.info(
-                f"[EMBEDDING_CHAIN] Generating sample embeddings for analysis using EmbeddingGenerationTool"
+    def _validate_state(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Check that a processing state can be embedded.
+
+        Args:
+            state: Processing state containing chunks and file information
+
+        Returns:
+            Failure result if the state is not usable, otherwise None
+        """
+        file_path = state.get("file_path", "unknown")
+
+        if not state.get("documents"):
+            logger.error(
+                f"[EMBEDDING_CHAIN] No chunks provided for embedding file {file_path}"
             )
-            sample_texts = [chunk.page_content for chunk in enhanced_chunks[:5]]
-            sample_embeddings = self.embedding_tool.generate_embeddings(sample_texts)
+            return {
+                "success": False,
+                "error": "No chunks provided for embedding",
+                "embeddings_stored": 0,
+            }
+
+        if not file_path:
+            logger.error(f"[EMBEDDING_CHAIN] No file_path provided")
+            return {
+                "success": False,
+                "error": "No file_path provided",
+                "embeddings_stored": 0,
+            }
 
-            # TOOL USAGE: Analyze embedding quality
+        return None
+
+    def _enhance_state_chunks(self, state: Dict[str, Any]) -> List[Document]:
+        """
+        Enhance a processing state's chunks with its resource and file info.
+
+        Args:
+            state: Processing state containing chunks and file information
+
+        Returns:
+            Enhanced chunks
+        """
+        original_filename = state.get("file_metadata", {}).get("file_name", "unknown")
+        return self.enhance_chunk_metadata(
+            state.get("documents", []),
+            state.get("resource_id", "unknown"),
+            original_filename,
+            state.get("file_key", "unknown"),
+        )
+
+    async def _astore_embedded(
+        self,
+        state: Dict[str, Any],
+        enhanced_chunks: List[Document],
+        all_embeddings: Optional[List[List[float]]],
+        batch_size: int,
+    ) -> Dict[str, Any]:
+        """
+        Store chunks and build the embedding result.
+
+        Args:
+            state: Processing state the chunks belong to
+            enhanced_chunks: Chunks with enhanced metadata
+            all_embeddings: Embeddings aligned with enhanced_chunks, or None
+                to embed the chunks here
+            batch_size: Number of rows written per vector store upsert batch
+
+        Returns:
+            Embedding result for the state
+        """
+        file_path = state.get("file_path", "unknown")
+        resource_id = state.get("resource_id", "unknown")
+
+        logger.info(
+            f"[EMBEDDING_CHAIN] Storing {len(enhanced_chunks)} documents in vector database via VectorService"
+        )
+        if len(enhanced_chunks) > BULK_INGEST_THRESHOLD:
             logger.info(
-                f"[EMBEDDING_CHAIN] Analyzing embedding quality using EmbeddingAnalysisTool"
+                f"[EMBEDDING_CHAIN] Using bulk ingestion for {len(enhanced_chunks)} chunks"
+            )
+            storage_result = await self.vector_service.abulk_store_documents(
+                enhanced_chunks,
+                resource_id,
+                embeddings=(
+                    all_embeddings
+                    if all_embeddings is not None
+                    else self._aiter_embedding_windows(enhanced_chunks)
+                ),
             )
-            embedding_analysis = self.analysis_tool.analyze_embedding_quality(
-                sample_embeddings[0]
+        else:
+            if all_embeddings is None:
+                all_embeddings = await self.aembed_chunks(enhanced_chunks)
+            storage_result = await self.vector_service.astore_documents(
+                enhanced_chunks,
+                resource_id,
+                embeddings=all_embeddings,
+                batch_size=batch_size,
             )
 
-            logger.info(
-                f"[EMBEDDING_CHAIN] Embedding processing completed for file {file_path}"
+        if not storage_result["success"]:
+            logger.error(
+                f"[EMBEDDING_CHAIN] Failed to store embeddings for file {file_path}: {storage_result['error'] or 'Unknown error'}"
             )
             return {
-                "success": True,
-                "embeddings_stored": storage_result.get("document_count", 0),
-                "document_ids": storage_result.get("document_ids", []),
-                "embedding_analysis": embedding_analysis,
-                "collection_name": storage_result.get("collection_name", "unknown"),
-                "storage_metadata": {
-                    "embedding_model": storage_result.get("embedding_model", "unknown"),
-                    "total_chunks": len(enhanced_chunks),
-                    "resource_id": resource_id,
-                    "file_path": file_path,
-                },
+                "success": False,
+                "error": f"Failed to store documents in vector database: {storage_result['error'] or 'Unknown error'}",
+                "embeddings_stored": 0,
             }
 
+        # Analyze quality on already-computed vectors instead of re-embedding
+        sample_embeddings = storage_result.get("sample_embeddings", [])
+        embedding_analysis = (
+            self.analysis_tool.analyze_embedding_quality(sample_embeddings)
+            if sample_embeddings
+            else {}
+        )
+
+        logger.info(
+            f"[EMBEDDING_CHAIN] Embedding processing completed for file {file_path}"
+        )
+        return {
+            "success": True,
+            "embeddings_stored": storage_result.get("document_count", 0),
+            "document_ids": storage_result.get("document_ids", []),
+            "embedding_analysis": embedding_analysis,
+            "collection_name": storage_result.get("collection_name", "unknown"),
+            "storage_metadata": {
+                "embedding_model": storage_result.get("embedding_model", "unknown"),
+                "total_chunks": len(enhanced_chunks),
+                "resource_id": resource_id,
+                "file_path": file_path,
+            },
+        }
+
+    async def _aiter_embedding_windows(
+        self, chunks: List[Document]
+    ) -> AsyncIterator[List[List[float]]]:
+        """
+        Embed chunks window by window for streaming into a bulk load.
+
+        Args:
+            chunks: Chunks to embed
+
+        Yields:
+            Embeddings for each consecutive window of chunks
+        """
+        for start in range(0, len(chunks), BULK_EMBEDDING_WINDOW):
+            yield await self.aembed_chunks(chunks[start : start + BULK_EMBEDDING_WINDOW])
+
+    async def aembed_chunks(self, chunks: List[Document]) -> List[List[float]]:
+        """
+        Embed chunks, reusing cached embeddings for already-seen content.
+
+        Each chunk's content hash is stored in its metadata. Identical chunks
+        share one embedding; distinct cache misses are embedded concurrently
+        in fixed-size batches and written back to the cache. Cache errors are
+        logged and treated as misses.
+
+        Args:
+            chunks: Chunks to embed
+
+        Returns:
+            Embeddings aligned with chunks
+        """
+        # Texts are pulled out of the Document objects once and reused for
+        # hashing and for the embedding requests
+        texts = [chunk.page_content for chunk in chunks]
+        content_hash = self.embedding_cache.content_hash
+        hashes = [content_hash(text) for text in texts]
+        for chunk, h in zip(chunks, hashes):
+            chunk.metadata["content_hash"] = h.hex()
+
+        try:
+            cached = await self.embedding_cache.aget_many(hashes)
         except Exception as e:
-            logger.error(
-                f"[EMBEDDING_CHAIN] Embedding processing failed for file {file_path}: {str(e)}",
-                exc_info=True,
-            )
-            return {"success": False, "error": str(e), "embeddings_stored": 0}
+            logger.warning(f"[EMBEDDING_CHAIN] Embedding cache lookup failed: {str(e)}")
+            cached = {}
+
+        # One representative chunk per distinct uncached content, so repeated
+        # boilerplate (headers, footers, notices) is embedded only once
+        miss_indices: Dict[bytes, int] = {}
+        for i, h in enumerate(hashes):
+            if h not in cached and h not in miss_indices:
+                miss_indices[h] = i
+        logger.info(
+            f"[EMBEDDING_CHAIN] Embedding cache: {len(chunks)} chunks, {len(set(hashes))} distinct, {len(miss_indices)} to embed"
+        )
 
-    def _enhance_chunk_metadata(
+        # Embed misses concurrently in fixed-size batches
+        miss_texts = [texts[i] for i in miss_indices.values()]
+        tasks = [
+            self.embedding_tool.aembed_batch(miss_texts[i : i + EMBEDDING_BATCH_SIZE])
+            for i in range(0, len(miss_texts), EMBEDDING_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        new_embeddings: List[List[float]] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            new_embeddings.extend(result)
+
+        computed = dict(zip(miss_indices, new_embeddings))
+        try:
+            await self.embedding_cache.aput_many(computed)
+        except Exception as e:
+            logger.warning(f"[EMBEDDING_CHAIN] Embedding cache write failed: {str(e)}")
+
+        cached.update(computed)
+        return [cached[h] for h in hashes]
+
+    def enhance_chunk_metadata(
         self,
         chunks: List[Document],
         resource_id: Optional[str] = None,
@@ -153,59 +399,78 @@ class EmbeddingChain:
         """
         Enhance chunk metadata with project and attachment information.
 
+        Metadata is updated in place; no new Document objects are created.
+
         Args:
             chunks: List of document chunks
             resource_id: Resource identifier
             original_filename: Original filename of the document
 
         Returns:
-            Enhanced chunks with additional metadata
+            The same chunks with additional metadata
         """
-        enhanced_chunks = []
-
         # Ensure resource_id is a string (convert from UUID if needed)
         resource_id_str = str(resource_id) if resource_id else None
 
-        for chunk in chunks:
-            # Sanitize existing metadata to ensure JSON serialization
-            sanitized_metadata = self._sanitize_metadata(chunk.metadata)
-
-            # Create a copy of the chunk with enhanced metadata
-            enhanced_metadata = {
-                **sanitized_metadata,
-                "resource_id": resource_id_str,
-                "original_filename": original_filename or "unknown",
-                "source_file": original_filename
-                or "unknown",  # For backward compatibility
-                "chunk_id": f"{original_filename}_{chunk.metadata.get('chunk_index', 0)}",
-                "file_key": file_key or "unknown",
-                "embedding_timestamp": str(int(__import__("time").time())),
-            }
-
-            enhanced_chunk = Document(
-                page_content=chunk.page_content, metadata=enhanced_metadata
+        # Values shared by every chunk of this ingestion
+        original_filename = original_filename or "unknown"
+        shared_metadata = {
+            "resource_id": resource_id_str,
+            "original_filename": original_filename,
+            "source_file": original_filename,  # For backward compatibility
+            "file_key": file_key or "unknown",
+            "embedding_timestamp": str(int(_time())),
+        }
+        chunk_id_prefix = f"{original_filename}_"
+
+        # Single pass per chunk: sanitize, then stamp the shared fields
+        for i, chunk in enumerate(chunks):
+            md = chunk.metadata
+
+            for key, value in md.items():
+                if not isinstance(value, _JSON_SAFE):
+                    # Convert UUID objects and other non-serializable types to strings
+                    md[key] = str(value)
+
+            md.update(shared_metadata)
+            chunk_index = md.setdefault("chunk_index", i)
+            md["chunk_id"] = chunk_id_prefix + str(chunk_index)
+
+        # Validate once per ingestion that the metadata serializes cleanly
+        # (e.g. integers beyond 64 bits); fall back to strings if not
+        try:
+            orjson.dumps([chunk.metadata for chunk in chunks])
+        except orjson.JSONEncodeError as e:
+            logger.warning(
+                f"[EMBEDDING_CHAIN] Metadata not JSON serializable, stringifying values: {str(e)}"
             )
-            enhanced_chunks.append(enhanced_chunk)
+            for chunk in chunks:
+                md = chunk.metadata
+                for key, value in md.items():
+                    if value is not None and not isinstance(value, str):
+                        md[key] = str(value)
 
-        return enhanced_chunks
+        return chunks
 
-    def _sanitize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Sanitize metadata to ensure JSON serialization compatibility.
 
-        Args:
-            metadata: Original metadata dictionary
+# Global shared embedding chain instance
+_shared_embedding_chain: Optional[EmbeddingChain] = None
 
-        Returns:
-            Sanitized metadata with all values converted to JSON-serializable types
-        """
-        sanitized = {}
-        for key, value in metadata.items():
-            if value is None:
-                sanitized[key] = None
-            elif hasattr(value, "__str__"):
-                # Convert UUID objects and other non-serializable types to strings
-                sanitized[key] = str(value)
-            else:
-                sanitized[key] = value
-        return sanitized
+
+def get_shared_embedding_chain() -> EmbeddingChain:
+    """
+    Get shared EmbeddingChain instance for the process.
+
+    The chain holds no per-call state, so nodes can reuse one instance
+    instead of rebuilding its tools and clients on every invocation.
+
+    Returns:
+        EmbeddingChain: Shared chain instance
+    """
+    global _shared_embedding_chain
+
+    if _shared_embedding_chain is None:
+        _shared_embedding_chain = EmbeddingChain()
+        logger.info("[EMBEDDING_CHAIN] Created shared EmbeddingChain instance")
+
+    return _shared_embedding_chain
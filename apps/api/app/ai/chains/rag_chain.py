@@ -1,17 +1,58 @@
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from langchain_core.documents import Document
+from langchain_core.messages import SystemMessage, HumanMessage
 from langchain.schema.runnable import RunnableLambda, RunnableParallel
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from app.ai.services.vector_service import VectorService
 from app.core.config import settings
-from app.ai.prompts.rag_prompts import RAG_SYSTEM_PROMPT
+from app.ai.prompts.rag_prompts import (
+    RAG_CASE_PROMPT,
+    RAG_CONTEXT_BLOCK,
+    format_case_prompt,
+    format_context_block,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Retrieve top 10 relevant chunks
+RETRIEVER_SEARCH_KWARGS = {"k": 10}
+
+# Context passed to the LLM when retrieval finds nothing
+NO_RELEVANT_DOCUMENTS_CONTEXT = "No relevant documents found in the resource."
+
+# Global shared chat model instance
+_shared_llm: Optional[ChatOpenAI] = None
+
+
+def get_shared_llm() -> ChatOpenAI:
+    """
+    Get shared streaming ChatOpenAI instance for the process.
+
+    The model holds no per-request state, so every RAG request reuses its
+    HTTP client and pooled connections to OpenAI instead of building new ones.
+
+    Returns:
+        ChatOpenAI: Shared chat model instance
+    """
+    global _shared_llm
+
+    if _shared_llm is None:
+        _shared_llm = ChatOpenAI(
+            model=settings.MODEL,
+            streaming=True,
+            # Final chunk carries token usage, including prompt-cache hits
+            stream_usage=True,
+            openai_api_key=settings.OPENAI_API_KEY,
+        )
+        logger.info("[RAG_CHAIN] Created shared ChatOpenAI instance")
+
+    return _shared_llm
+
 
 class RAGChain:
     """Complete RAG system implementation using LangChain, pgvector, and OpenAI."""
@@ -27,20 +68,43 @@ class RAGChain:
         self.resource_id = resource_id
         self.vector_service = vector_service
 
-        # Initialize LLM with streaming support
-        self.llm = ChatOpenAI(
-            model=settings.MODEL, streaming=True, openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Shared LLM with streaming support
+        self.llm = get_shared_llm()
 
-        # Create resource-specific retriever using existing VectorService
-        self.retriever = self.vector_service.create_retriever(
-            resource_id=resource_id,
-            search_kwargs={"k": 10},  # Retrieve top 10 relevant chunks
-        )
+        # Resource-specific retriever for the sync path, created lazily on first use
+        self._retriever = None
 
         # Build the RAG chain
         self.chain = self._build_rag_chain()
 
+    @property
+    def retriever(self):
+        """Resource-specific retriever, created synchronously on first access."""
+        if self._retriever is None:
+            self._retriever = self.vector_service.create_retriever(
+                resource_id=self.resource_id, search_kwargs=RETRIEVER_SEARCH_KWARGS
+            )
+        return self._retriever
+
+    def _retrieve(self, query: str) -> List[Document]:
+        """Retrieve relevant documents synchronously."""
+        return self.retriever.invoke(query)
+
+    async def _aretrieve(self, query: str) -> List[Document]:
+        """Retrieve relevant documents asynchronously via the halfvec index."""
+        return await self.vector_service.asimilarity_search_halfvec(
+            query, self.resource_id, k=RETRIEVER_SEARCH_KWARGS["k"]
+        )
+
+    def start_retrieval(self, query: str) -> "asyncio.Task[List[Document]]":
+        """
+        Start retrieving documents for a query in the background.
+
+        Lets a caller overlap retrieval with its own I/O; pass the returned
+        task to astream().
+        """
+        return asyncio.create_task(self._aretrieve(query))
+
     def _build_rag_chain(self):
         """
         Build the RAG chain following LangChain patterns.
@@ -52,13 +116,18 @@ class RAGChain:
         # Using centralized prompt constant for consistency and maintainability
         rag_prompt = ChatPromptTemplate.from_messages(
             [
-                ("system", RAG_SYSTEM_PROMPT),
+                ("system", RAG_CASE_PROMPT),
                 MessagesPlaceholder(variable_name="chat_history"),
+                ("system", RAG_CONTEXT_BLOCK),
                 ("human", "{input}"),
             ]
         )
 
-        context_chain = RunnableLambda(lambda x: x["input"]) | self.retriever | RunnableLambda(self._format_docs)
+        context_chain = (
+            RunnableLambda(lambda x: x["input"])
+            | RunnableLambda(self._retrieve, afunc=self._aretrieve)
+            | RunnableLambda(self._format_docs)
+        )
 
         rag_chain = (
             RunnableParallel(
@@ -90,33 +159,27 @@ class RAGChain:
             Formatted context string with source attribution
         """
         if not docs:
-            return "No relevant documents found in the resource."
+            return NO_RELEVANT_DOCUMENTS_CONTEXT
 
-        formatted_docs = []
+        buf = []
         for i, doc in enumerate(docs, 1):
             # Extract metadata for source attribution
-            metadata = doc.metadata
+            get = doc.metadata.get
             # Try to get the actual filename from various metadata fields
-            source_file = (
-                metadata.get("source_file") or metadata.get("file_type") or "Unknown"
-            )
-
-            page = metadata.get("page") or metadata.get("page_number", "N/A")
-            chunk_index = metadata.get("chunk_index", "")
+            source_file = get("source_file") or get("file_type") or "Unknown"
+            page = get("page") or get("page_number", "N/A")
+            chunk_index = get("chunk_index", "")
 
             # Create a more informative source reference
-            if chunk_index:
+            if chunk_index != "":
                 source_ref = f"File: {source_file}, Page: {page}, Chunk: {chunk_index}"
             else:
                 source_ref = f"File: {source_file}, Page: {page}"
 
-            formatted_doc = f"""
-               Document {i} ({source_ref}):
-               {doc.page_content}
-            """
-            formatted_docs.append(formatted_doc)
+            # No indentation: leading whitespace is paid for as prompt tokens
+            buf.append(f"Document {i} ({source_ref}):\n{doc.page_content}\n")
 
-        return "\n".join(formatted_docs)
+        return "\n".join(buf)
 
     def invoke(self, input_data: Dict[str, Any], callbacks=None) -> str:
         """
@@ -157,12 +220,18 @@ class RAGChain:
             logger.error(f"[RAG_CHAIN] Error processing query: {str(e)}")
             raise
 
-    async def astream(self, input_data: Dict[str, Any]):
+    async def astream(
+        self,
+        input_data: Dict[str, Any],
+        retrieval_task: Optional["asyncio.Task[List[Document]]"] = None,
+    ):
         """
         Stream the RAG chain response.
 
         Args:
             input_data: Dictionary containing input and chat_history
+            retrieval_task: Optional task from start_retrieval() for the same
+                input; started here when not given
 
         Yields:
             Streaming response chunks with context information
@@ -184,29 +253,24 @@ class RAGChain:
                 f"[RAG_CHAIN] Starting streaming for query: {user_input[:50]}..."
             )
 
-            # Retrieve relevant documents
-            relevant_docs = self.retriever.invoke(user_input)
-            logger.info(
-                f"[RAG_CHAIN] Retrieved {len(relevant_docs)} relevant documents"
-            )
-
-            # Format context
-            context = self._format_docs(relevant_docs)
-
-            # Use the LLM's astream method directly for better streaming
-            # Create the system message with context using centralized prompt
-            from langchain_core.messages import SystemMessage, HumanMessage
-
-            system_content = RAG_SYSTEM_PROMPT.format(context=context, resource_details=resource_details)
+            # Start retrieval immediately; it overlaps with message preparation
+            if retrieval_task is None:
+                retrieval_task = self.start_retrieval(user_input)
 
-            # Create messages for the LLM
+            # Create messages for the LLM; context is appended once it is ready
+            system_content = format_case_prompt(resource_details)
             messages = [SystemMessage(content=system_content)]
-
-            # Add chat history if any
             if chat_history:
                 messages.extend(chat_history)
 
-            # Add the current user message
+            relevant_docs = await retrieval_task
+            logger.info(
+                f"[RAG_CHAIN] Retrieved {len(relevant_docs)} relevant documents"
+            )
+
+            # Per-query context goes after the history to keep the prefix cacheable
+            context = self._format_docs(relevant_docs)
+            messages.append(SystemMessage(content=format_context_block(context)))
             messages.append(HumanMessage(content=user_input))
 
             # Stream directly from the LLM
@@ -0,0 +1,179 @@
+"""
+Streaming ingestion chain that overlaps chunking, embedding and storage.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from app.ai.chains.embedding_chain import get_shared_embedding_chain
+from app.ai.tools.chunking_tools import get_shared_chunking_tool
+
+logger = logging.getLogger(__name__)
+
+# Source documents chunked per producer step
+DOCUMENTS_PER_CHUNK_BATCH = 8
+
+# Bounded queues give backpressure between stages
+QUEUE_MAX_SIZE = 4
+
+# Stage-local worker counts (1 chunker, N embedders, M upserters)
+EMBED_WORKERS = 3
+UPSERT_WORKERS = 2
+
+
+class StreamingIngestChain:
+    """
+    Chain that chunks, embeds and stores documents as a pipeline.
+
+    A single chunk producer feeds micro-batches into a bounded queue that
+    embedding workers drain; embedded batches are handed to upsert workers
+    through a second bounded queue. Chunking of the next micro-batch runs
+    while the previous one is being embedded and written.
+    """
+
+    def __init__(self):
+        """
+        Initialize the streaming ingest chain.
+        """
+        self.chunking_tool = get_shared_chunking_tool()
+        self.embedding_chain = get_shared_embedding_chain()
+        self.vector_service = self.embedding_chain.vector_service
+
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Chunk, embed and store the state's documents as a pipeline.
+
+        Args:
+            state: Processing state containing parsed documents and file information
+
+        Returns:
+            Result with number of chunks and embeddings stored
+        """
+        file_path = state.get("file_path", "unknown")
+        resource_id = state.get("resource_id", "unknown")
+        documents = state.get("documents", [])
+        content_type = state.get("file_type", "unknown")
+        original_filename = state.get("file_metadata", {}).get("file_name", "unknown")
+        file_key = state.get("file_key", "unknown")
+
+        logger.info(
+            f"[STREAMING_INGEST_CHAIN] Starting streaming ingestion of {len(documents)} documents for file {file_path}"
+        )
+
+        if not documents:
+            return {
+                "success": False,
+                "error": "No documents provided for ingestion",
+                "embeddings_stored": 0,
+            }
+
+        loop = asyncio.get_running_loop()
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX_SIZE)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX_SIZE)
+        counters = {"chunks": 0, "stored": 0}
+
+        async def chunk_producer() -> None:
+            for start in range(0, len(documents), DOCUMENTS_PER_CHUNK_BATCH):
+                chunks = await loop.run_in_executor(
+                    None,
+                    self.chunking_tool.adaptive_chunk,
+                    documents[start : start + DOCUMENTS_PER_CHUNK_BATCH],
+                    content_type,
+                )
+                if not chunks:
+                    continue
+
+                # Keep chunk_index unique across micro-batches
+                for offset, chunk in enumerate(chunks, counters["chunks"]):
+                    chunk.metadata["chunk_index"] = offset
+                counters["chunks"] += len(chunks)
+
+                await chunk_queue.put(
+                    self.embedding_chain.enhance_chunk_metadata(
+                        chunks, resource_id, original_filename, file_key
+                    )
+                )
+
+            for _ in range(EMBED_WORKERS):
+                await chunk_queue.put(None)
+
+        async def embed_consumer() -> None:
+            while (batch := await chunk_queue.get()) is not None:
+                embeddings = await self.embedding_chain.aembed_chunks(batch)
+                await upsert_queue.put((batch, embeddings))
+
+        async def upserter() -> None:
+            while (item := await upsert_queue.get()) is not None:
+                batch, embeddings = item
+                result = await self.vector_service.astore_documents(
+                    batch, resource_id, embeddings=embeddings, ensure_table=False
+                )
+                counters["stored"] += result.get("document_count", 0)
+
+        errors: List[BaseException] = []
+        try:
+            # Create the collection once up front instead of per micro-batch
+            await self.vector_service.aensure_collection(resource_id)
+
+            async with asyncio.TaskGroup() as upsert_group:
+                for _ in range(UPSERT_WORKERS):
+                    upsert_group.create_task(upserter())
+
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(chunk_producer())
+                    for _ in range(EMBED_WORKERS):
+                        group.create_task(embed_consumer())
+
+                # Only reached once every batch is embedded; on failure the
+                # upsert group cancels the upserters instead, since a full
+                # queue with no consumer left would block a sentinel forever
+                for _ in range(UPSERT_WORKERS):
+                    await upsert_queue.put(None)
+
+        except* Exception as eg:
+            errors.extend(eg.exceptions)
+
+        if errors:
+            logger.error(
+                f"[STREAMING_INGEST_CHAIN] Streaming ingestion failed for file {file_path}: {str(errors[0])}",
+                exc_info=errors[0],
+            )
+            return {
+                "success": False,
+                "error": str(errors[0]),
+                "embeddings_stored": counters["stored"],
+            }
+
+        logger.info(
+            f"[STREAMING_INGEST_CHAIN] Stored {counters['stored']} of {counters['chunks']} chunks for file {file_path}"
+        )
+        return {
+            "success": True,
+            "chunks_created": counters["chunks"],
+            "embeddings_stored": counters["stored"],
+            "collection_name": self.vector_service.get_collection_name(resource_id),
+        }
+
+
+# Global shared streaming ingest chain instance
+_shared_streaming_ingest_chain: Optional[StreamingIngestChain] = None
+
+
+def get_shared_streaming_ingest_chain() -> StreamingIngestChain:
+    """
+    Get shared StreamingIngestChain instance for the process.
+
+    The chain keeps its pipeline state local to aprocess, so concurrent
+    ingestions can share one instance and its tools.
+
+    Returns:
+        StreamingIngestChain: Shared chain instance
+    """
+    global _shared_streaming_ingest_chain
+
+    if _shared_streaming_ingest_chain is None:
+        _shared_streaming_ingest_chain = StreamingIngestChain()
+        logger.info("[STREAMING_INGEST_CHAIN] Created shared StreamingIngestChain instance")
+
+    return _shared_streaming_ingest_chain
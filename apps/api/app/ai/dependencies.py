@@ -1,12 +1,15 @@
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Request
 from app.ai.services.chat_service import ChatService
-from app.ai.services.vector_service import VectorService
+from app.ai.services.vector_service import VectorService, get_shared_vector_service
 
 
-def get_vector_service() -> VectorService:
-    """Get VectorService instance."""
-    return VectorService()
+def get_vector_service(request: Request) -> VectorService:
+    """Get the process-wide VectorService instance created at startup."""
+    vector_service = getattr(request.app.state, "vector_service", None)
+    if vector_service is None:
+        vector_service = get_shared_vector_service()
+    return vector_service
 
 def get_chat_service(vector_service: VectorService = Depends(get_vector_service)) -> ChatService:
     """Get ChatService instance with dependencies."""
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from typing import Dict, Any
+from app.ai.chains.embedding_chain import get_shared_embedding_chain
+from app.ai.services.vector_service import DEFAULT_STORE_BATCH_SIZE
+from app.ai.schemas.workflow_states import ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+# Files fetched, parsed and chunked at once; each holds a downloaded file and
+# its parsed documents in memory, so large batches are worked through in waves
+MAX_CONCURRENT_PREPARATIONS = 8
+
+
+async def batch_ingest_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lightweight LangGraph node container for ingesting several files at once.
+    Each file is fetched, parsed and chunked by the document preparation
+    workflow; the chunks of all files are then embedded together by the
+    EmbeddingChain.
+
+    Args:
+        state: State with a "files" list of DocumentProcessingState dicts
+
+    Returns:
+        Updated state with one final state per file
+    """
+    # Lazy import to avoid circular dependency with the workflows package
+    from app.ai.workflows.document_processing_workflow import (
+        get_document_preparation_workflow_instance,
+    )
+
+    files = state.get("files", [])
+    batch_size = state.get("batch_size") or DEFAULT_STORE_BATCH_SIZE
+    logger.info(f"[BATCH_INGEST_NODE] Starting batch ingestion of {len(files)} files")
+
+    preparation_workflow = get_document_preparation_workflow_instance()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PREPARATIONS)
+
+    async def prepare(file_state: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await preparation_workflow.ainvoke(file_state)
+
+    prepared = await asyncio.gather(
+        *[prepare(file_state) for file_state in files],
+        return_exceptions=True,
+    )
+
+    final_states = []
+    chunked_indices = []
+    for i, (file_state, result) in enumerate(zip(files, prepared)):
+        if isinstance(result, BaseException):
+            logger.error(
+                f"[BATCH_INGEST_NODE] Preparation failed for file {file_state.get('file_key')}: {str(result)}"
+            )
+            result = {
+                **file_state,
+                "status": ProcessingStatus.FAILED,
+                "error_message": f"Document preparation failed: {str(result)}",
+            }
+        elif result.get("status") == ProcessingStatus.DOCUMENTS_CHUNKED:
+            chunked_indices.append(i)
+        final_states.append(result)
+
+    logger.info(
+        f"[BATCH_INGEST_NODE] Embedding chunks of {len(chunked_indices)} of {len(files)} files together"
+    )
+    chain_results = await get_shared_embedding_chain().aprocess_many(
+        [final_states[i] for i in chunked_indices], batch_size=batch_size
+    )
+
+    for i, chain_result in zip(chunked_indices, chain_results):
+        file_state = final_states[i]
+        if chain_result["success"]:
+            final_states[i] = {
+                **file_state,
+                "documents": [],
+                "status": ProcessingStatus.EMBEDDINGS_STORED,
+                "embeddings_stored": chain_result["embeddings_stored"],
+            }
+        else:
+            logger.error(
+                f"[BATCH_INGEST_NODE] Embedding failed for file {file_state.get('file_path', 'unknown')}: {chain_result['error']}"
+            )
+            final_states[i] = {
+                **file_state,
+                "status": ProcessingStatus.FAILED,
+                "error_message": f"Embedding failed: {chain_result['error']}",
+                "embeddings_stored": 0,
+            }
+
+    return {**state, "files": final_states, "status": ProcessingStatus.COMPLETED}
@@ -1,11 +1,13 @@
+import asyncio
 import logging
 from typing import Dict, Any
-from apps.api.app.ai.tools.chunking_tools import TextChunkingTool
+from app.ai.tools.chunking_tools import get_shared_chunking_tool
+from app.ai.schemas.workflow_states import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
 
-def chunker_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def chunker_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Lightweight LangGraph node container for text chunking.
     This node delegates all text chunking logic to the TextChunkingTool.
@@ -27,9 +29,9 @@ def chunker_node(state: Dict[str, Any]) -> Dict[str, Any]:
             f"[CHUNKER_NODE] Chunking {len(documents)} documents for {content_type} content"
         )
 
-        text_chunking_tool = TextChunkingTool()
-        chunked_documents = text_chunking_tool.adaptive_chunk(
-            documents, content_type
+        # Chunking is CPU-bound; keep it off the event loop
+        chunked_documents = await asyncio.get_running_loop().run_in_executor(
+            None, get_shared_chunking_tool().adaptive_chunk, documents, content_type
         )
 
         logger.info(
@@ -37,15 +39,13 @@ def chunker_node(state: Dict[str, Any]) -> Dict[str, Any]:
         )
 
         return {
-            **state,
             "documents": chunked_documents,
-            "status": "documents_chunked",
+            "status": ProcessingStatus.DOCUMENTS_CHUNKED,
         }
     except Exception as e:
         logger.error(f"[CHUNKER_NODE] Text chunking failed: {str(e)}")
         return {
-            **state,
             "error_message": f"Text chunking failed: {str(e)}",
             "documents": [],
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
         }
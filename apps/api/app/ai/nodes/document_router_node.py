@@ -3,10 +3,33 @@ Document router node - lightweight container for routing documents by type.
 """
 
 import logging
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Final, Mapping
+from app.ai.schemas.workflow_states import ProcessingRoute, ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
+# File type -> processing route (read-only, built once at import)
+_ROUTING_TABLE: Final[Mapping[str, ProcessingRoute]] = MappingProxyType(
+    {
+        "pdf": ProcessingRoute.PDF,
+        "docx": ProcessingRoute.DOCX,
+        # Handle .doc files with docx processor
+        "doc": ProcessingRoute.DOCX,
+        "xlsx": ProcessingRoute.EXCEL,
+        "xls": ProcessingRoute.EXCEL,
+        # Route CSV files to excel processor
+        "csv": ProcessingRoute.EXCEL,
+        "txt": ProcessingRoute.TEXT,
+        # Handle markdown with text processor
+        "md": ProcessingRoute.TEXT,
+        "jpg": ProcessingRoute.IMAGE,
+        "jpeg": ProcessingRoute.IMAGE,  # Handle .jpeg extension
+        "png": ProcessingRoute.IMAGE,
+        "tiff": ProcessingRoute.IMAGE,
+    }
+)
+
 
 def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -40,8 +63,7 @@ def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 f"[DOCUMENT_ROUTER_NODE] No file path provided by file fetcher for  file {filename}"
             )
             return {
-                **state,
-                "status": "failed",
+                "status": ProcessingStatus.FAILED,
                 "error_message": "No file path provided by file fetcher",
             }
 
@@ -50,8 +72,7 @@ def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 f"[DOCUMENT_ROUTER_NODE] No file type detected by file fetcher for file {filename}"
             )
             return {
-                **state,
-                "status": "failed",
+                "status": ProcessingStatus.FAILED,
                 "error_message": "File type could not be determined by file fetcher",
             }
 
@@ -63,11 +84,11 @@ def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
         processing_route = _get_routing_decision(file_type, is_supported)
 
         # Log the routing decision
-        if processing_route == "unsupported":
+        if processing_route == ProcessingRoute.UNSUPPORTED:
             logger.warning(
                 f"[DOCUMENT_ROUTER_NODE] File format not supported for file {filename}"
             )
-        elif processing_route == "unknown":
+        elif processing_route == ProcessingRoute.UNKNOWN:
             logger.warning(
                 f"[DOCUMENT_ROUTER_NODE] Unknown file type '{file_type}' for file {filename}"
             )
@@ -81,8 +102,7 @@ def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
         )
 
         return {
-            **state,
-            "status": "routed",
+            "status": ProcessingStatus.ROUTED,
             "processing_route": processing_route,
         }
 
@@ -92,13 +112,12 @@ def document_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
             exc_info=True,
         )
         return {
-            **state,
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
             "error_message": f"Document routing failed: {str(e)}",
         }
 
 
-def _get_routing_decision(file_type: str, is_supported: bool) -> str:
+def _get_routing_decision(file_type: str, is_supported: bool) -> ProcessingRoute:
     """
     Switch-style routing decision logic.
 
@@ -107,30 +126,8 @@ def _get_routing_decision(file_type: str, is_supported: bool) -> str:
         is_supported: Whether format is supported
 
     Returns:
-        Tuple of (processing_route, next_processor)
+        Processing route name
     """
-    # Check support first
     if not is_supported:
-        return "unsupported"
-
-    # Switch pattern for file type routing
-    routing_switch = {
-        "pdf": "pdf",
-        "docx": "docx",
-        # Handle .doc files with docx processor
-        "doc": "docx",
-        "xlsx": "excel",
-        "xls": "excel",
-        # Route CSV files to excel processor
-        "csv": "excel",
-        "txt": "text",
-        # Handle markdown with text processor
-        "md": "text",
-        "jpg": "image",
-        "jpeg": "image",  # Handle .jpeg extension
-        "png": "image",
-        "tiff": "image",
-    }
-
-    # Get routing decision from switch
-    return routing_switch.get(file_type, "unknown")
+        return ProcessingRoute.UNSUPPORTED
+    return _ROUTING_TABLE.get(file_type, ProcessingRoute.UNKNOWN)
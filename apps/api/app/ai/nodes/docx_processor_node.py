@@ -1,11 +1,16 @@
+import asyncio
 import logging
 from typing import Dict, Any
-from apps.api.app.ai.tools.docx_tools import DOCXExtractionTool
+from app.ai.tools.docx_tools import DOCXExtractionTool
+from app.ai.schemas.workflow_states import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
+# Shared across invocations; the tool is stateless
+_docx_tool = DOCXExtractionTool()
 
-def docx_processor_node(state: Dict[str, Any]) -> Dict[str, Any]:
+
+async def docx_processor_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Lightweight LangGraph node container for DOCX parsing.
     This node delegates all DOCX parsing logic to the DOCXExtractionTool.
@@ -19,23 +24,23 @@ def docx_processor_node(state: Dict[str, Any]) -> Dict[str, Any]:
     try:
         file_path = state.get('file_path')
         logger.info(f"[DOCX_PARSER_NODE] Starting DOCX parser for file path: {file_path}")
-        
-        docx_tool = DOCXExtractionTool()
-        parsed_documents = docx_tool.extract_text(file_path)
+
+        # DOCX parsing is CPU-bound; keep it off the event loop
+        parsed_documents = await asyncio.get_running_loop().run_in_executor(
+            None, _docx_tool.extract_text, file_path
+        )
         logger.info(
             f"[DOCX_PARSER_NODE] Extracted {len(parsed_documents)} documents from {file_path}"
         )
         return {
-            **state,
             "documents": parsed_documents,
-            "status": "docx_processed",
+            "status": ProcessingStatus.DOCX_PROCESSED,
             "current_step": "docx_processed",
         }
     except Exception as e:
         logger.error(f"[DOCX_PARSER_NODE] DOCX extraction failed: {str(e)}")
         return {
-            **state,
             "error_message": f"DOCX extraction failed: {str(e)}",
             "documents": [],
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
         }
@@ -1,11 +1,13 @@
 import logging
 from typing import Dict, Any
-from apps.api.app.ai.chains.embedding_chain import EmbeddingChain
+from app.ai.chains.embedding_chain import get_shared_embedding_chain
+from app.ai.services.vector_service import DEFAULT_STORE_BATCH_SIZE
+from app.ai.schemas.workflow_states import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
 
-def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Lightweight LangGraph node container for storing documents in vector database.
     This node delegates all storing documents logic to the VectorService.
@@ -22,21 +24,18 @@ def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
         chunks = state.get("documents", [])
         file_path = state.get("file_path", "unknown")
         resource_id = state.get("resource_id", "unknown")
+        batch_size = state.get("batch_size") or DEFAULT_STORE_BATCH_SIZE
         logger.info(
             f"[EMBEDDER_NODE] Processing {len(chunks)} chunks for file {resource_id}"
         )
 
-        # Initialize embedding chain
-        logger.info(
-            f"[EMBEDDER_NODE] Initializing embedding chain for file {file_path}"
-        )
-        embedding_chain = EmbeddingChain()
+        embedding_chain = get_shared_embedding_chain()
 
         # Process chunks through embedding chain
         logger.info(
             f"[EMBEDDER_NODE] Delegating to embedding chain for file {file_path}"
         )
-        chain_result = embedding_chain.process(state)
+        chain_result = await embedding_chain.aprocess(state, batch_size=batch_size)
 
         logger.info(f"[EMBEDDER_NODE] Chain result: {chain_result}")
         
@@ -48,9 +47,11 @@ def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
             logger.info(
                 f"[EMBEDDER_NODE] Stored {chain_result['embeddings_stored']} embeddings in collection {chain_result['collection_name']}"
             )
+            # Only the count crosses the state boundary; drop the chunks so
+            # they can be reclaimed as soon as the node returns
             return {
-                **state,
-                "status": "embeddings_stored",
+                "documents": [],
+                "status": ProcessingStatus.EMBEDDINGS_STORED,
                 "embeddings_stored": chain_result["embeddings_stored"],
             }
         else:
@@ -58,8 +59,8 @@ def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 f"[EMBEDDER_NODE] Embedding failed for file {file_path}: {chain_result['error']}"
             )
             return {
-                **state,
-                "status": "failed",
+                "documents": [],
+                "status": ProcessingStatus.FAILED,
                 "error_message": f"Embedding failed: {chain_result['error']}",
                 "embeddings_stored": 0,
             }
@@ -68,8 +69,7 @@ def embedder_node(state: Dict[str, Any]) -> Dict[str, Any]:
             f"[EMBEDDER_NODE] Failed to store documents in vector database: {str(e)}"
         )
         return {
-            **state,
             "error_message": f"Failed to store documents in vector database: {str(e)}",
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
             "embeddings_stored": 0,
         }
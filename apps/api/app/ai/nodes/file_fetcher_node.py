@@ -1,13 +1,25 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
+from app.ai.schemas.workflow_states import ProcessingStatus
 from app.ai.tools.storage_tools import FileStorageTool, FileMetadataTool
-import gc
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# Shared across invocations; boto3 clients are thread-safe and costly to build
+_storage_tool: Optional[FileStorageTool] = None
 
-def file_fetcher_node(state: Dict[str, Any]) -> Dict[str, Any]:
+
+def _get_storage_tool() -> FileStorageTool:
+    """Get the shared storage tool, created on first use."""
+    global _storage_tool
+    if _storage_tool is None:
+        _storage_tool = FileStorageTool()
+    return _storage_tool
+
+
+async def file_fetcher_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Lightweight LangGraph node container for file fetching.
 
@@ -31,8 +43,7 @@ def file_fetcher_node(state: Dict[str, Any]) -> Dict[str, Any]:
         if not file_key:
             logger.error(f"[FILE_FETCHER_NODE] No file key provided")
             return {
-                **state,
-                "status": "failed",
+                "status": ProcessingStatus.FAILED,
                 "error_message": "No file key provided",
             }
 
@@ -40,41 +51,32 @@ def file_fetcher_node(state: Dict[str, Any]) -> Dict[str, Any]:
             f"[FILE_FETCHER_NODE] Initializing storage tools for file {file_key}"
         )
         # Initialize self-contained storage tools (no service dependency)
-        storage_tool = FileStorageTool()
+        storage_tool = _get_storage_tool()
         metadata_tool = FileMetadataTool()
 
         logger.info(
             f"[FILE_FETCHER_NODE] Downloading file from S3 with key: {file_key}"
         )
-        # Download file from S3 to local temp file
-        local_path = storage_tool.download_from_s3(file_key)
+        # Download file from S3 to local temp file without blocking the event loop
+        local_path = await asyncio.to_thread(storage_tool.download_from_s3, file_key)
         logger.info(f"[FILE_FETCHER_NODE] File downloaded to: {local_path}")
 
-        # Force garbage collection after file download
-        gc.collect()
-
         logger.info(f"[FILE_FETCHER_NODE] Getting file metadata for file {file_key}")
-        # Get file metadata
-        file_info = metadata_tool.get_file_info(local_path)
-
-        # Detect file type
-        file_type = metadata_tool.detect_file_type(local_path)
+        # Get file metadata, type, support and time estimate in one pass
+        inspection = metadata_tool.inspect(local_path)
+        file_info = inspection["file_info"]
+        file_type = inspection["file_type"]
+        is_supported = inspection["is_supported"]
+        time_estimate = inspection["processing_estimate"]
         logger.info(f"[FILE_FETCHER_NODE] Detected file type: {file_type}")
-
-        # Check if format is supported
-        is_supported = metadata_tool.is_supported_format(local_path)
         logger.info(f"[FILE_FETCHER_NODE] File format supported: {is_supported}")
-
-        # Estimate processing time
-        time_estimate = metadata_tool.estimate_processing_time(local_path)
         logger.info(f"[FILE_FETCHER_NODE] Processing time estimate: {time_estimate}")
 
         logger.info(
             f"[FILE_FETCHER_NODE] File fetch completed successfully for file {file_key}"
         )
         return {
-            **state,
-            "status": "file_fetched",
+            "status": ProcessingStatus.FILE_FETCHED,
             "file_path": local_path,
             "file_key": file_key,
             "file_type": file_type,
@@ -89,7 +91,6 @@ def file_fetcher_node(state: Dict[str, Any]) -> Dict[str, Any]:
             exc_info=True,
         )
         return {
-            **state,
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
             "error_message": f"File fetching failed: {str(e)}",
         }
@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any
 from apps.api.app.ai.tools.image_tools import ImageExtractionTool
+from app.ai.schemas.workflow_states import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +27,12 @@ def image_processor_node(state: Dict[str, Any]) -> Dict[str, Any]:
             f"[IMAGE_PARSER_NODE] Extracted {len(parsed_documents)} documents from {file_path}"
         )
         return {
-            **state,
             "documents": parsed_documents,
-            "status": "image_processed",
+            "status": ProcessingStatus.IMAGE_PROCESSED,
         }
     except Exception as e:
         logger.error(f"[IMAGE_PARSER_NODE] Image extraction failed: {str(e)}")
         return {
-            **state,
             "error_message": f"Image extraction failed: {str(e)}",
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
         }
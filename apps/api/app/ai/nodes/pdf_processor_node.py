@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any
 from apps.api.app.ai.tools.pdf_tools import PDFExtractionTool
+from app.ai.schemas.workflow_states import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +27,12 @@ def pdf_processor_node(state: Dict[str, Any]) -> Dict[str, Any]:
             f"[PDF_PARSER_NODE] Extracted {len(parsed_documents)} documents from {file_path}"
         )
         return {
-            **state,
             "documents": parsed_documents,
-            "status": "pdf_processed",
+            "status": ProcessingStatus.PDF_PROCESSED,
         }
     except Exception as e:
         logger.error(f"[PDF_PARSER_NODE] PDF extraction failed: {str(e)}")
         return {
-            **state,
             "error_message": f"PDF extraction failed: {str(e)}",
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
         }
@@ -4,19 +4,104 @@ RAG processor node - lightweight container for RAG query processing.
 This node delegates all RAG processing logic to the RAGChain.
 """
 
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from app.ai.schemas.workflow_states import RAGChatState
-from app.ai.chains.rag_chain import RAGChain
-from app.ai.services.vector_service import VectorService
+from app.ai.chains.rag_chain import (
+    NO_RELEVANT_DOCUMENTS_CONTEXT,
+    RAGChain,
+    RETRIEVER_SEARCH_KWARGS,
+    get_shared_llm,
+)
+from app.ai.services.context_cache_service import store_context
+from app.ai.services.vector_service import get_shared_vector_service
 import logging
 
-from apps.api.app.ai.prompts.rag_prompts import RAG_SYSTEM_PROMPT
+from app.ai.prompts.rag_prompts import format_case_prompt, format_context_block
 
 logger = logging.getLogger(__name__)
 
+# Per-document context block: index, source file, page, chunk index, content
+_CONTEXT_DOC_TEMPLATE = (
+    "Document {} (File: {}, Page: {}, Chunk: {}):\nText Content:\n{}\n"
+)
+
+# Most recent conversation messages written to the debug log per request
+_DEBUG_LOG_MAX_MESSAGES = 20
+
+# Formatted retrieval contexts kept per process, and how long one stays valid;
+# the TTL bounds how long newly uploaded documents can go unseen
+RETRIEVAL_CACHE_MAX_ENTRIES = 256
+RETRIEVAL_CACHE_TTL_SECONDS = 300.0
+
+# (resource_id, query hash) -> (cached_at, context), least recently used first
+_retrieval_cache: "OrderedDict[Tuple[UUID, bytes], Tuple[float, str]]" = OrderedDict()
+
+
+async def _retrieve_context(resource_id: UUID, user_input: str) -> str:
+    """Retrieve relevant documents for a query and format them as LLM context."""
+    logger.info(
+        f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Retrieving documents for resource {resource_id}"
+    )
+
+    # Retrieve relevant documents through the halfvec ANN index
+    relevant_docs = await get_shared_vector_service().asimilarity_search_halfvec(
+        user_input, resource_id, k=RETRIEVER_SEARCH_KWARGS["k"]
+    )
+    logger.info(
+        f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Retrieved {len(relevant_docs)} relevant documents"
+    )
+
+    # Format context from documents
+    if not relevant_docs:
+        return NO_RELEVANT_DOCUMENTS_CONTEXT
+
+    formatted_docs: List[str] = [""] * len(relevant_docs)
+    for i, doc in enumerate(relevant_docs):
+        get = doc.metadata.get
+        formatted_docs[i] = _CONTEXT_DOC_TEMPLATE.format(
+            i + 1,
+            get("source_file") or get("file_name") or get("original_filename"),
+            get("page") or get("page_number", "N/A"),
+            get("chunk_index", ""),
+            doc.page_content,
+        )
+    return "\n\n".join(formatted_docs)
+
+
+def _retrieval_cache_key(resource_id: UUID, query: str) -> Tuple[UUID, bytes]:
+    """Key a query by resource and a hash of its case- and space-normalized text."""
+    normalized = " ".join(query.casefold().split())
+    return resource_id, hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+
+def _get_cached_retrieval(cache_key: Tuple[UUID, bytes]) -> Optional[str]:
+    """Get a cached context if it is younger than RETRIEVAL_CACHE_TTL_SECONDS."""
+    cached = _retrieval_cache.get(cache_key)
+    if cached is None:
+        return None
+
+    cached_at, context = cached
+    if time.monotonic() - cached_at > RETRIEVAL_CACHE_TTL_SECONDS:
+        del _retrieval_cache[cache_key]
+        return None
+
+    _retrieval_cache.move_to_end(cache_key)
+    return context
+
+
+def _cache_retrieval(cache_key: Tuple[UUID, bytes], context: str) -> None:
+    """Write through a freshly retrieved context, evicting the oldest entry."""
+    _retrieval_cache[cache_key] = (time.monotonic(), context)
+    if len(_retrieval_cache) > RETRIEVAL_CACHE_MAX_ENTRIES:
+        _retrieval_cache.popitem(last=False)
+
+
 def rag_processor_node(state: RAGChatState) -> Dict[str, Any]:
     """
     Lightweight LangGraph node container for RAG processing.
@@ -32,18 +117,12 @@ def rag_processor_node(state: RAGChatState) -> Dict[str, Any]:
     Returns:
         Updated state with RAG processing results
     """
-    resource_id = (
-        state.resource_id
-        if hasattr(state, "resource_id")
-        else state.get("resource_id", "unknown")
-    )
+    resource_id = state.get("resource_id", "unknown")
     logger.info(f"[RAG_PROCESSOR_NODE] Starting RAG processing for resource {resource_id}")
 
     try:
         # Extract messages from state (LangGraph already merged conversation history)
-        messages = (
-            state.messages if hasattr(state, "messages") else state.get("messages", [])
-        )
+        messages = state.get("messages", [])
         if not messages:
             logger.info(
                 f"[RAG_PROCESSOR_NODE] No messages provided for resource {resource_id}"
@@ -55,7 +134,7 @@ def rag_processor_node(state: RAGChatState) -> Dict[str, Any]:
 
         # Get the last human message (the current user input)
         last_message = messages[-1]
-        if not isinstance(last_message, HumanMessage):
+        if getattr(last_message, "type", None) != "human":
             logger.info(
                 f"[RAG_PROCESSOR_NODE] Expected human message for resource {resource_id}"
             )
@@ -76,21 +155,18 @@ def rag_processor_node(state: RAGChatState) -> Dict[str, Any]:
         # Initialize RAG processing chain
         logger.info(f"[RAG_PROCESSOR_NODE] Initializing RAGChain for resource {resource_id}")
 
-        # IMPORTANT: Use shared VectorService from the workflow instead of creating new one
-        # The vector_service should be passed through the workflow state or we need to modify
-        # the workflow to pass it to the node. For now, we'll create a new one but this
-        # should be optimized to use the shared instance.
-        vector_service = VectorService()  # This will use the shared engine
+        # Use the process-wide VectorService instead of creating a new one
+        vector_service = get_shared_vector_service()
 
         # Create RAG chain with resource context
-        rag_chain = RAGChain(UUID(resource_id), vector_service)
+        rag_chain = RAGChain(resource_id, vector_service)
 
         # Process through chain
         logger.info(f"[RAG_PROCESSOR_NODE] Delegating to RAGChain for resource {resource_id}")
 
         # Use invoke method for consistent processing
         chain_result = rag_chain.invoke(
-            {"input": user_input, "chat_history": chat_history, "resource_details": state.resource_details}
+            {"input": user_input, "chat_history": chat_history, "resource_details": state.get("resource_details")}
         )
 
         # Extract results
@@ -117,7 +193,7 @@ def rag_processor_node(state: RAGChatState) -> Dict[str, Any]:
         return {
             # ← add_messages will append this automatically
             "messages": [ai_message_dict],
-            "context": context,
+            "context_ref": store_context(context),
             "answer": answer,
         }
 
@@ -152,23 +228,14 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
     Returns:
         Updated state with RAG processing results
     """
-    from langchain_openai import ChatOpenAI
-    from app.core.config import settings
-
-    resource_id = (
-        state.resource_id
-        if hasattr(state, "resource_id")
-        else state.get("resource_id", "unknown")
-    )
+    resource_id = state.get("resource_id", "unknown")
     logger.info(
         f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Starting async streaming RAG processing for resource {resource_id}"
     )
 
     try:
         # Extract messages from state (LangGraph already merged conversation history)
-        messages = (
-            state.messages if hasattr(state, "messages") else state.get("messages", [])
-        )
+        messages = state.get("messages", [])
         if not messages:
             logger.info(
                 f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] No messages provided for resource {resource_id}"
@@ -180,27 +247,32 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
 
         # Get the last human message (the current user input)
         last_message = messages[-1]
-        logger.info(
-            f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Last message type: {type(last_message)}, content: {getattr(last_message, 'content', '')[:50]}..."
-        )
-
-        # Debug: Log all messages to understand the conversation state
         logger.info(
             f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Total messages in conversation: {len(messages)}"
         )
-        for i, msg in enumerate(messages):
-            logger.info(
-                f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Message {i}: {type(msg)} - {getattr(msg, 'content', '')[:50]}..."
+
+        # Debug: Log recent messages to understand the conversation state; the
+        # guard keeps long conversations from formatting strings nobody reads
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Last message type: {type(last_message)}, content: {getattr(last_message, 'content', '')[:50]}..."
             )
+            first_logged = max(0, len(messages) - _DEBUG_LOG_MAX_MESSAGES)
+            for i in range(first_logged, len(messages)):
+                msg = messages[i]
+                logger.debug(
+                    f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Message {i}: {type(msg)} - {getattr(msg, 'content', '')[:50]}..."
+                )
 
-        if not isinstance(last_message, HumanMessage):
+        if getattr(last_message, "type", None) != "human":
             logger.info(
                 f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Expected human message for resource {resource_id}, got {type(last_message)}"
             )
             # Instead of returning an error, try to find the last human message
-            human_messages = [msg for msg in messages if isinstance(msg, HumanMessage)]
-            if human_messages:
-                last_human_message = human_messages[-1]
+            last_human_message = next(
+                (msg for msg in reversed(messages) if msg.type == "human"), None
+            )
+            if last_human_message is not None:
                 logger.info(
                     f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Found last human message: {last_human_message.content[:50]}..."
                 )
@@ -224,62 +296,22 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
         # Prepare chat history (exclude the current message)
         chat_history = messages[:-1] if len(messages) > 1 else []
 
-        # Initialize vector service for document retrieval
-        logger.info(
-            f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Initializing VectorService for resource {resource_id}"
-        )
-
-        vector_service = VectorService()  # This will use the shared engine
-
-        # Retrieve relevant documents
-        retriever = vector_service.create_retriever(
-            resource_id=UUID(resource_id), search_kwargs={"k": 10}
-        )
-
-        relevant_docs = retriever.invoke(user_input)
-        logger.info(
-            f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Retrieved {len(relevant_docs)} relevant documents"
-        )
-
-        # Format context from documents
-        context = ""
-        if relevant_docs:
-            formatted_docs = []
-            for i, doc in enumerate(relevant_docs, 1):
-                metadata = doc.metadata
-                source_file = (
-                    metadata.get("source_file")
-                    or metadata.get("file_name")
-                    or metadata.get("original_filename")
-                )
-                page = metadata.get("page") or metadata.get("page_number", "N/A")
-                chunk_index = metadata.get("chunk_index", "")
-
-                formatted_docs.append(
-                    f"Document {i} (File: {source_file}, Page: {page}, Chunk: {chunk_index}):\n"
-                    f"Text Content:\n{doc.page_content}\n"
-                )
-            context = "\n\n".join(formatted_docs)
+        # Follow-up turns often repeat a query; reuse its context while fresh
+        cache_key = _retrieval_cache_key(resource_id, user_input)
+        context = _get_cached_retrieval(cache_key)
+        if context is not None:
+            logger.info(
+                f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Reusing cached context for resource {resource_id}"
+            )
         else:
-            context = "No relevant documents found in the resource."
+            context = await _retrieve_context(resource_id, user_input)
+            _cache_retrieval(cache_key, context)
 
-        # Initialize LLM with streaming support
-        llm = ChatOpenAI(
-            model=settings.MODEL,
-            streaming=True,  # This enables streaming
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
-
-        # Create system message with context
-        from langchain_core.messages import SystemMessage
-        from langchain_core.prompts import PromptTemplate
+        # Shared LLM with streaming support
+        llm = get_shared_llm()
 
-        template = PromptTemplate(
-            template=RAG_SYSTEM_PROMPT,
-            input_variables=['context', 'resource_details'],
-        )
-        
-        system_content = template.format(context=context, resource_details=state.resource_details)
+        # Create system message with the case details
+        system_content = format_case_prompt(state.get("resource_details"))
 
         # Create messages for the LLM
         llm_messages = [SystemMessage(content=system_content)]
@@ -288,6 +320,9 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
         if chat_history:
             llm_messages.extend(chat_history)
 
+        # Per-query context goes after the history to keep the prefix cacheable
+        llm_messages.append(SystemMessage(content=format_context_block(context)))
+
         # Add the current user message
         llm_messages.append(HumanMessage(content=user_input))
 
@@ -297,9 +332,18 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
             f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Calling LLM with async streaming for resource {resource_id}"
         )
 
-        # Use ainvoke for async streaming - this is what enables LangGraph workflow streaming
-        response = await llm.ainvoke(llm_messages)
-        answer = response.content
+        # Consume tokens as they are generated; LangGraph forwards each chunk to
+        # stream_mode="messages" consumers while we accumulate the final answer
+        answer_parts = []
+        cache_hit_tokens = 0
+        async for chunk in llm.astream(llm_messages):
+            answer_parts.append(chunk.content)
+            if chunk.usage_metadata:
+                # Prompt tokens served from OpenAI's automatic prefix cache
+                cache_hit_tokens = chunk.usage_metadata.get(
+                    "input_token_details", {}
+                ).get("cache_read", 0)
+        answer = "".join(answer_parts)
         
         # Create AI response message as serializable dictionary
         ai_message_dict = {
@@ -315,6 +359,9 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
         logger.info(
             f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Generated response length: {len(answer)} characters"
         )
+        logger.info(
+            f"[RAG_PROCESSOR_NODE_STREAMING_ASYNC] Prompt cache hit tokens: {cache_hit_tokens}"
+        )
 
         # Return the final state for LangGraph
         # IMPORTANT: We return the AI message to be appended to the conversation
@@ -322,8 +369,9 @@ async def rag_processor_node_streaming_async(state: RAGChatState) -> Dict[str, A
         return {
             # This will be appended to existing messages
             "messages": [ai_message_dict],
-            "context": context,
+            "context_ref": store_context(context),
             "answer": answer,
+            "cache_hit_tokens": cache_hit_tokens,
         }
 
     except Exception as e:
@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, Any
+from app.ai.chains.streaming_ingest_chain import get_shared_streaming_ingest_chain
+from app.ai.schemas.workflow_states import ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+
+async def streaming_ingest_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lightweight LangGraph node container for pipelined chunking and embedding.
+    This node delegates all ingestion logic to the StreamingIngestChain.
+
+    Args:
+        state: DocumentProcessingState containing parsed documents and resource id
+
+    Returns:
+        Updated state with storing documents results in vector database
+    """
+    file_path = state.get("file_path", "unknown")
+    logger.info(f"[STREAMING_INGEST_NODE] Starting streaming ingestion for file {file_path}")
+
+    try:
+        chain_result = await get_shared_streaming_ingest_chain().aprocess(state)
+
+        if chain_result["success"]:
+            logger.info(
+                f"[STREAMING_INGEST_NODE] Stored {chain_result['embeddings_stored']} embeddings in collection {chain_result['collection_name']}"
+            )
+            return {
+                "documents": [],
+                "status": ProcessingStatus.EMBEDDINGS_STORED,
+                "embeddings_stored": chain_result["embeddings_stored"],
+            }
+
+        logger.error(
+            f"[STREAMING_INGEST_NODE] Streaming ingestion failed for file {file_path}: {chain_result['error']}"
+        )
+        return {
+            "status": ProcessingStatus.FAILED,
+            "error_message": f"Embedding failed: {chain_result['error']}",
+            "embeddings_stored": chain_result.get("embeddings_stored", 0),
+        }
+    except Exception as e:
+        logger.error(
+            f"[STREAMING_INGEST_NODE] Failed to store documents in vector database: {str(e)}"
+        )
+        return {
+            "error_message": f"Failed to store documents in vector database: {str(e)}",
+            "status": ProcessingStatus.FAILED,
+            "embeddings_stored": 0,
+        }
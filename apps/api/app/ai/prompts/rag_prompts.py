@@ -2,7 +2,9 @@
 # RAG (Retrieval-Augmented Generation) Prompts
 # =============================================================================
 
-RAG_SYSTEM_PROMPT = """You are an expert legal assistant specializing in U.S. immigration law and visa documentation.
+# Fully static instructions. Kept first and byte-identical across requests so
+# OpenAI automatic prompt caching can reuse it for every case and turn.
+RAG_STATIC_PREAMBLE = """You are an expert legal assistant specializing in U.S. immigration law and visa documentation.
 You work within Voyager®, a technology-driven immigration management platform, where cases are opened for
 Foreign Nationals (FNs) seeking U.S. visas or green cards.
 
@@ -37,10 +39,37 @@ RESPONSE GUIDELINES:
 - Always format dates in MM/DD/YYYY format (e.g., 01/15/2024, 12/25/2023) regardless of how they were originally submitted.
 - Respond naturally and conversationally as if you naturally know this information about the case.
 
-Here are some useful details about the current opened case on this immigration platform:
+"""
+
+# Per-case details: stable across all turns of one case
+RAG_RESOURCE_BLOCK = """Here are some useful details about the current opened case on this immigration platform:
 {resource_details}
 
-Use the provided context from the uploaded documents to answer the user's question accurately and helpfully.
+"""
+
+# Retrieved context: changes with every query, so it goes last
+RAG_CONTEXT_BLOCK = """Use the provided context from the uploaded documents to answer the user's question accurately and helpfully.
 
 Context from the documents uploaded to the current case:
 {context}"""
+
+# Case-level system prompt sent ahead of the chat history. Only the per-query
+# RAG_CONTEXT_BLOCK follows the history, so static instructions, case details
+# and earlier turns form one prefix that stays cacheable across a conversation.
+RAG_CASE_PROMPT = RAG_STATIC_PREAMBLE + RAG_RESOURCE_BLOCK
+
+# Fixed text either side of each placeholder, split once at import. Messages
+# built directly (outside a ChatPromptTemplate) join these with the values
+# instead of having str.format rescan the whole template every request.
+_CASE_PROMPT_HEAD, _CASE_PROMPT_TAIL = RAG_CASE_PROMPT.split("{resource_details}")
+_CONTEXT_BLOCK_HEAD, _CONTEXT_BLOCK_TAIL = RAG_CONTEXT_BLOCK.split("{context}")
+
+
+def format_case_prompt(resource_details) -> str:
+    """Equivalent to RAG_CASE_PROMPT.format(resource_details=resource_details)."""
+    return "".join((_CASE_PROMPT_HEAD, str(resource_details), _CASE_PROMPT_TAIL))
+
+
+def format_context_block(context) -> str:
+    """Equivalent to RAG_CONTEXT_BLOCK.format(context=context)."""
+    return "".join((_CONTEXT_BLOCK_HEAD, str(context), _CONTEXT_BLOCK_TAIL))
@@ -1,67 +1,142 @@
-from typing import Annotated, List, Literal, Optional, Sequence
+from enum import StrEnum
+from typing import Annotated, Any, Dict, List, Optional, Sequence, TypedDict
 from langchain_core.documents import Document
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 from uuid import UUID
 
 
-class RAGChatState(BaseModel):
+class ProcessingRoute(StrEnum):
+    """Processor the document router sends a file to."""
+
+    PDF = "pdf"
+    DOCX = "docx"
+    EXCEL = "excel"
+    IMAGE = "image"
+    TEXT = "text"
+    UNSUPPORTED = "unsupported"
+    UNKNOWN = "unknown"
+
+
+class ProcessingStatus(StrEnum):
+    """Status of a file as it moves through the document processing workflow."""
+
+    PENDING = "pending"
+    FILE_FETCHED = "file_fetched"
+    ROUTED = "routed"
+    PDF_PROCESSED = "pdf_processed"
+    DOCX_PROCESSED = "docx_processed"
+    IMAGE_PROCESSED = "image_processed"
+    DOCUMENTS_CHUNKED = "documents_chunked"
+    EMBEDDINGS_STORED = "embeddings_stored"
+    COMPLETED = "completed"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+class RAGChatState(TypedDict, total=False):
     """
     State schema for RAG chat workflow.
 
     Follows LangGraph documentation pattern with message history and RAG context.
     Used for conversational RAG with persistent message history.
+
+    A TypedDict rather than a model: LangGraph hands nodes a plain dict of the
+    channel values and merges their partial returns, so a node transition costs
+    no object construction or validation. Input is checked once by
+    validate_rag_chat_input.
     """
 
-    messages: Annotated[Sequence[BaseMessage], add_messages] = Field(
-        default_factory=list
-    )
-    resource_id: str = Field(..., description="ID of the resource being queried")
-    context: str = Field(..., description="Context of the RAG chat")
-    resource_details: Optional[str] = Field(None, description="Details of the resource being queried")
-    answer: Optional[str] = Field(default=None, description="Generated answer from RAG")
-    error_message: Optional[str] = Field(
-        default=None, description="Error message if processing fails"
-    )
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # ID of the resource being queried; parsed once by validate_rag_chat_input
+    resource_id: UUID
+    # Reference to the retrieved context in context_cache_service; the text
+    # itself is kept out of the state so it is never checkpointed
+    context_ref: Optional[str]
+    # Details of the resource being queried
+    resource_details: Optional[str]
+    # Generated answer from RAG
+    answer: Optional[str]
+    # Error message if processing fails
+    error_message: Optional[str]
+    # Prompt tokens of the last LLM call served from the provider's prompt cache
+    cache_hit_tokens: Optional[int]
 
 
 class DocumentProcessingState(BaseModel):
     """
     State schema for document processing workflow.
 
-    This state is passed between nodes in the LangGraph workflow
-    and tracks the complete document processing pipeline.
+    Validates the externally supplied input once, at the service entry point.
+    Its dump seeds the graph, which then runs on DocumentProcessingGraphState
+    and passes node output between hops without re-validation; node results
+    are trusted, request payloads never are.
     """
 
-    file_key: str = Field(..., description="Key of the file to be processed")
-    resource_id: UUID = Field(
-        ..., description="ID of the resource to store the documents"
-    )
-    status: str = Field(default="pending", description="Overall processing status")
-
-    file_path: Optional[str] = Field(
-        None, description="Local path to the file to be processed"
-    )
-    file_type: Optional[str] = Field(
-        None,
-        description="Detected file type (pdf, docx, jpg, png, txt, md, csv, xlsx, xls)",
-    )
-
-    processing_route: Optional[
-        Literal["pdf", "docx", "excel", "image", "text", "unsupported"]
-    ] = Field(None, description="Router decision on which processor to use")
-
-    documents: Optional[List[Document]] = Field(
-        default_factory=list, description="Processed documents"
-    )
-    embeddings_stored: Optional[int] = Field(
-        default=0, description="Number of embeddings stored"
-    )
-    storage_metadata: Optional[dict] = Field(None, description="Storage metadata")
-    error_message: Optional[str] = Field(
-        default=None, description="Error message if processing fails"
-    )
-    file_metadata: Optional[dict] = Field(None, description="File metadata")
-    is_supported_format: Optional[bool] = Field(None, description="Is supported format")
-    processing_estimate: Optional[dict] = Field(None, description="Processing estimate")
+    # Schema is only needed where documents are processed (Celery workers), so
+    # build it on first use rather than at import in every process
+    model_config = ConfigDict(defer_build=True)
+
+    # Key of the file to be processed
+    file_key: str
+    # ID of the resource to store the documents
+    resource_id: UUID
+    # Overall processing status
+    status: ProcessingStatus = ProcessingStatus.PENDING
+
+    # Local path to the file to be processed
+    file_path: Optional[str] = None
+    # Detected file type (pdf, docx, jpg, png, txt, md, csv, xlsx, xls)
+    file_type: Optional[str] = None
+
+    # Router decision on which processor to use
+    processing_route: Optional[ProcessingRoute] = None
+
+    # Processed documents
+    documents: Optional[List[Document]] = Field(default_factory=list)
+    # Number of embeddings stored
+    embeddings_stored: Optional[int] = 0
+    # Number of documents per vector store upsert batch; None uses
+    # vector_service.DEFAULT_STORE_BATCH_SIZE
+    batch_size: Optional[int] = None
+    storage_metadata: Optional[dict] = None
+    # Error message if processing fails
+    error_message: Optional[str] = None
+    file_metadata: Optional[dict] = None
+    is_supported_format: Optional[bool] = None
+    processing_estimate: Optional[dict] = None
+
+
+class DocumentProcessingGraphState(TypedDict, total=False):
+    """
+    Channel schema for the document processing graph.
+
+    Mirrors DocumentProcessingState without validation. Each key is its own
+    LangGraph channel, so nodes return only the keys they change and LangGraph
+    merges them into the running state.
+    """
+
+    file_key: str
+    resource_id: UUID
+    status: ProcessingStatus
+    current_step: str
+    file_path: Optional[str]
+    file_type: Optional[str]
+    processing_route: Optional[ProcessingRoute]
+    documents: List[Document]
+    embeddings_stored: int
+    batch_size: Optional[int]
+    storage_metadata: Optional[Dict[str, Any]]
+    error_message: Optional[str]
+    file_metadata: Optional[Dict[str, Any]]
+    is_supported_format: Optional[bool]
+    processing_estimate: Optional[Dict[str, Any]]
+
+
+# Validates a whole batch of document states in one call at batch entry,
+# instead of constructing and dumping one model per file. Deferred like the
+# model itself.
+DocumentProcessingStateList = TypeAdapter(
+    List[DocumentProcessingState], config=ConfigDict(defer_build=True)
+)
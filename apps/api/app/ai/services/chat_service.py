@@ -5,20 +5,193 @@ This service handles RAG-based chat functionality with conversation
 persistence using LangGraph workflows.
 """
 
-from typing import Dict, Any, Optional, AsyncGenerator
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, AsyncGenerator, Set, Tuple
 from uuid import UUID
 from langchain_core.messages import HumanMessage, AIMessage
+from psycopg import OperationalError
+from psycopg_pool import PoolTimeout
 from app.ai.workflows.create_rag_chat_workflow import (
     create_rag_chat_workflow,
     validate_rag_chat_input,
     prepare_rag_chat_config,
 )
+from app.ai.chains.rag_chain import RAGChain
 from app.ai.services.checkpointer_service import CheckpointerService
+from app.ai.services.context_cache_service import get_context
 from app.ai.services.vector_service import VectorService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Compiled RAG chat workflows, keyed by async_mode. The graph does not depend
+# on the resource (resource_id travels in the state) and ChatService is
+# created per request, so the cache lives at module level.
+_workflow_cache: Dict[bool, Any] = {}
+_workflow_locks: Dict[bool, asyncio.Lock] = {}
+
+
+def clear_workflow_cache() -> None:
+    """Drop cached workflows, e.g. after the shared pool was replaced."""
+    _workflow_cache.clear()
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """Whether an error, or one it was raised from, is a database connection failure."""
+    while error is not None:
+        if isinstance(error, (OperationalError, PoolTimeout)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# Threads last seen with no checkpointed messages, so repeated history polls
+# before the first message skip the database. Writes in this process clear
+# their thread at once; the TTL bounds how long a write made by another
+# worker can go unseen.
+KNOWN_EMPTY_THREADS_MAX_ENTRIES = 4096
+KNOWN_EMPTY_THREADS_TTL_SECONDS = 2.0
+
+# thread_id -> time it was seen empty, oldest first
+_known_empty_threads: "OrderedDict[str, float]" = OrderedDict()
+
+# Bumped after every checkpoint write; a history read that overlapped a write
+# does not mark its thread empty
+_write_generation = 0
+
+
+def _mark_thread_empty(thread_id: str, read_generation: int) -> None:
+    """Remember a thread with no messages, evicting the oldest entry."""
+    if read_generation != _write_generation:
+        return
+    _known_empty_threads[thread_id] = time.monotonic()
+    _known_empty_threads.move_to_end(thread_id)
+    if len(_known_empty_threads) > KNOWN_EMPTY_THREADS_MAX_ENTRIES:
+        _known_empty_threads.popitem(last=False)
+
+
+def _is_known_empty(thread_id: str) -> bool:
+    """Whether a thread was seen empty within KNOWN_EMPTY_THREADS_TTL_SECONDS."""
+    seen_at = _known_empty_threads.get(thread_id)
+    if seen_at is None:
+        return False
+    if time.monotonic() - seen_at > KNOWN_EMPTY_THREADS_TTL_SECONDS:
+        _known_empty_threads.pop(thread_id, None)
+        return False
+    return True
+
+
+def _note_thread_written(thread_id: str) -> None:
+    """Forget that a thread was empty once a write to it has landed."""
+    global _write_generation
+    _write_generation += 1
+    _known_empty_threads.pop(thread_id, None)
+
+
+# Checkpoint writes running in the background, referenced until they finish
+_pending_writes: Set[asyncio.Task] = set()
+
+# Latest write started per thread; each new write waits for the one before
+# it, so turns land in order and never branch from the same checkpoint
+_thread_writes: Dict[str, asyncio.Task] = {}
+
+
+async def _write_state(
+    workflow, config: Dict[str, Any], values: Dict[str, Any], after=None
+) -> None:
+    """
+    Write a turn to the checkpoint without running the graph.
+
+    Args:
+        workflow: Compiled RAG chat workflow
+        config: Workflow config for the thread
+        values: State update to apply
+        after: Optional earlier write that must land first
+    """
+    try:
+        if after is not None:
+            # wait() does not raise if the earlier write failed or was cancelled
+            await asyncio.wait([after])
+        await workflow.aupdate_state(config, values, as_node="rag_processor")
+        _note_thread_written(config["configurable"]["thread_id"])
+    except Exception as e:
+        logger.error(f"[CHAT_SERVICE] Could not update workflow state: {str(e)}")
+
+
+def _start_write(workflow, config: Dict[str, Any], values: Dict[str, Any]) -> asyncio.Task:
+    """Queue a checkpoint write behind the thread's earlier writes."""
+    thread_id = config["configurable"]["thread_id"]
+    task = asyncio.create_task(
+        _write_state(workflow, config, values, after=_thread_writes.get(thread_id))
+    )
+    _thread_writes[thread_id] = task
+    _pending_writes.add(task)
+
+    def _finish(finished: asyncio.Task) -> None:
+        _pending_writes.discard(finished)
+        if _thread_writes.get(thread_id) is finished:
+            del _thread_writes[thread_id]
+
+    task.add_done_callback(_finish)
+    return task
+
+
+async def _wait_for_thread_writes(thread_id: str) -> None:
+    """Wait until the thread's queued checkpoint writes have landed."""
+    task = _thread_writes.get(thread_id)
+    if task is not None:
+        # The write carries on even if the waiting request is cancelled
+        await asyncio.wait([task])
+
+
+async def drain_pending_writes() -> None:
+    """Wait for background checkpoint writes to finish, e.g. at shutdown."""
+    if _pending_writes:
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
+
+
+# Roles for the message types a conversation holds; other types fall back to
+# their .type in _messages_to_history
+_ROLE_MAP = {HumanMessage: "human", AIMessage: "assistant"}
+
+
+def _messages_to_history(messages) -> list[dict[str, Any]]:
+    """
+    Convert LangGraph messages to the simple history format.
+
+    Args:
+        messages: Conversation messages from the workflow state
+
+    Returns:
+        List of dicts with role, content and timestamp; empty messages skipped
+    """
+    history = []
+    for message in messages:
+        content = getattr(message, "content", "")
+        if not content:
+            continue
+
+        role = _ROLE_MAP.get(type(message))
+        if role is None:
+            message_type = getattr(message, "type", None)
+            if message_type is None:
+                role = "unknown"
+            else:
+                role = "human" if message_type == "human" else "assistant"
+
+        history.append(
+            {
+                "role": role,
+                "content": content,
+                "timestamp": (getattr(message, "additional_kwargs", None) or {}).get(
+                    "timestamp"
+                ),
+            }
+        )
+    return history
+
 
 class ChatService:
     """
@@ -46,6 +219,56 @@ class ChatService:
         """
         Get or create RAG chat workflow for the resource.
 
+        The compiled workflow is cached per process, so checkpointer setup and
+        graph compilation run once rather than on every request. A workflow
+        that fell back to the memory checkpointer is not cached, so the next
+        request retries PostgreSQL.
+
+        Args:
+            resource_id: Resource UUID
+            async_mode: If True, create async workflow for streaming
+
+        Returns:
+            Compiled LangGraph workflow
+        """
+        workflow = _workflow_cache.get(async_mode)
+        if workflow is not None:
+            return workflow
+
+        lock = _workflow_locks.setdefault(async_mode, asyncio.Lock())
+        async with lock:
+            # Another request may have built it while we waited
+            workflow = _workflow_cache.get(async_mode)
+            if workflow is not None:
+                return workflow
+
+            workflow = await self._create_workflow(resource_id, async_mode)
+            checkpointer_type = self._checkpointer_service.get_checkpointer_type(
+                workflow.checkpointer
+            )
+            if checkpointer_type == "PostgreSQL":
+                _workflow_cache[async_mode] = workflow
+            return workflow
+
+    def _discard_workflow(self, error: Exception, async_mode: bool = True) -> None:
+        """
+        Drop the cached workflow after a connection or pool failure so the
+        next request builds a new one, resetting the pool first if it timed
+        out. Other errors (LLM, retrieval, bad input) keep the workflow.
+
+        Args:
+            error: Error raised by the workflow call
+            async_mode: Mode of the workflow that failed
+        """
+        if not _is_connection_error(error):
+            return
+        _workflow_cache.pop(async_mode, None)
+        self._checkpointer_service.reset_on_pool_timeout(error)
+
+    async def _create_workflow(self, resource_id: UUID, async_mode: bool):
+        """
+        Create RAG chat workflow.
+
         Args:
             resource_id: Resource UUID
             async_mode: If True, create async workflow for streaming
@@ -105,20 +328,20 @@ class ChatService:
             # Prepare workflow input
             input_data = {
                 "message": message,
-                "resource_id": str(resource_id),
+                "resource_id": resource_id,
                 "thread_id": thread_id or "default",
             }
 
-            # Debug: Log what we're preparing
-            logger.info(f"[CHAT_SERVICE] Input data: {input_data}")
-
             # Validate input
             validated_input = validate_rag_chat_input(input_data)
             config = prepare_rag_chat_config(thread_id or "default")
 
-            # Debug: Log what we're passing to the workflow
-            logger.info(f"[CHAT_SERVICE] Validated input: {validated_input}")
-            logger.info(f"[CHAT_SERVICE] Config: {config}")
+            # Debug: Log what we're passing to the workflow; the guard skips
+            # formatting the message dicts when nobody reads them
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[CHAT_SERVICE] Input data: {input_data}")
+                logger.debug(f"[CHAT_SERVICE] Validated input: {validated_input}")
+                logger.debug(f"[CHAT_SERVICE] Config: {config}")
 
             # Get async workflow for regular chat (consistent with ainvoke)
             workflow = await self._get_workflow(resource_id, async_mode=True)
@@ -127,23 +350,13 @@ class ChatService:
             logger.info(
                 f"[CHAT_SERVICE] Executing async workflow for resource {resource_id}"
             )
+            await _wait_for_thread_writes(thread_id or "default")
             result = await workflow.ainvoke(validated_input, config=config)
+            _note_thread_written(thread_id or "default")
 
             # Extract response
             answer = result.get("answer", "")
-            context = result.get("context", "")
-            messages = result.get("messages", [])
-
-            # Get AI message from result
-            ai_message = None
-            if messages:
-                for msg in reversed(messages):
-                    if isinstance(msg, AIMessage):
-                        ai_message = msg
-                        break
-
-            if not ai_message:
-                ai_message = AIMessage(content=answer)
+            context = get_context(result.get("context_ref"))
 
             logger.info(
                 f"[CHAT_SERVICE] Successfully processed message for resource {resource_id}"
@@ -163,8 +376,45 @@ class ChatService:
             logger.error(
                 f"[CHAT_SERVICE] Failed to process chat message for resource {resource_id}: {str(e)}"
             )
+            self._discard_workflow(e)
             raise RuntimeError(f"Failed to process chat message: {str(e)}")
 
+    async def send_message_batch(
+        self,
+        resource_id: UUID,
+        items: List[Tuple[str, Optional[str]]],
+        max_concurrency: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send several chat messages concurrently.
+
+        Each item goes through send_message, so all of them share the cached
+        workflow; at most max_concurrency run at once.
+
+        Args:
+            resource_id: Resource UUID
+            items: (message, thread_id) for each message to send
+            max_concurrency: Maximum number of messages processed at once
+
+        Returns:
+            One send_message response per item, in the same order
+
+        Raises:
+            RuntimeError: If processing any message fails
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send_one(message: str, thread_id: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.send_message(resource_id, message, thread_id)
+
+        logger.info(
+            f"[CHAT_SERVICE] Processing batch of {len(items)} messages for resource {resource_id}"
+        )
+        return await asyncio.gather(
+            *[send_one(message, thread_id) for message, thread_id in items]
+        )
+
     async def send_message_non_streaming(
         self, resource_id: UUID, message: str, thread_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -198,15 +448,11 @@ class ChatService:
             # Prepare input for workflow
             input_data = {
                 "message": message,
-                "resource_id": str(resource_id),
+                "resource_id": resource_id,
                 "thread_id": thread_id or "default",
             }
 
             # Prepare config for conversation persistence
-            from app.ai.workflows.create_rag_chat_workflow import (
-                prepare_rag_chat_config,
-            )
-
             config = prepare_rag_chat_config(thread_id or "default")
 
             logger.info(
@@ -215,7 +461,9 @@ class ChatService:
 
             # Use workflow directly for non-streaming processing
             # This handles conversation state, persistence, and processing automatically
+            await _wait_for_thread_writes(thread_id or "default")
             result = await workflow.ainvoke(input_data, config=config)
+            _note_thread_written(thread_id or "default")
 
             logger.info(
                 f"[CHAT_SERVICE] Successfully processed message for resource {resource_id}"
@@ -242,6 +490,7 @@ class ChatService:
             logger.error(
                 f"[CHAT_SERVICE] Failed to process message for resource {resource_id}: {str(e)}"
             )
+            self._discard_workflow(e)
             raise RuntimeError(f"Failed to process message: {str(e)}")
 
     async def stream_message(
@@ -271,72 +520,63 @@ class ChatService:
         Raises:
             RuntimeError: If processing fails
         """
-        import asyncio
-
         try:
 
             logger.info(
                 f"[CHAT_SERVICE] Processing streaming message for resource {resource_id}, thread {thread_id}"
             )
 
-            # Step 1: Update workflow state FIRST to save the user message
-            # This ensures conversation history is saved even if streaming fails
             workflow = await self._get_workflow(resource_id, async_mode=True)
 
             # Prepare input for workflow state update
             workflow_input = {
                 "message": message,
-                "resource_id": str(resource_id),
+                "resource_id": resource_id,
                 "resource_details": str(resource_details),
                 "thread_id": thread_id or "default",
             }
 
             # Validate input
-            from app.ai.workflows.create_rag_chat_workflow import (
-                validate_rag_chat_input,
-                prepare_rag_chat_config,
-            )
-
             validated_input = validate_rag_chat_input(workflow_input)
             config = prepare_rag_chat_config(thread_id or "default")
 
-            # Update workflow state to save user message
-            logger.info(f"[CHAT_SERVICE] Updating workflow state with user message")
-            await workflow.ainvoke(validated_input, config=config)
+            # Retrieval only needs the message, so it runs while the history
+            # is read
+            rag_chain = RAGChain(resource_id, self.vector_service)
+            retrieval_task = rag_chain.start_retrieval(message)
 
-            # Step 2: Get conversation history from updated workflow state
+            # Step 1: Get conversation history as it stood before this turn
             conversation_history = []
             try:
-                # Get current state to extract conversation history
-                current_state = await workflow.aget_state(config)
-
-                if (
-                    current_state
-                    and hasattr(current_state, "values")
-                    and "messages" in current_state.values
-                ):
-                    conversation_history = current_state.values["messages"]
-                    logger.info(
-                        f"[CHAT_SERVICE] Loaded {len(conversation_history)} messages from conversation history"
-                    )
+                # The previous turn's answer may still be on its way to the
+                # checkpoint
+                await _wait_for_thread_writes(thread_id or "default")
+                conversation_history = await self._checkpointer_service.aget_messages(
+                    workflow.checkpointer, thread_id or "default"
+                )
+                logger.info(
+                    f"[CHAT_SERVICE] Loaded {len(conversation_history)} messages from conversation history"
+                )
             except Exception as e:
                 logger.error(
                     f"[CHAT_SERVICE] Could not load conversation history: {str(e)}"
                 )
+                self._discard_workflow(e)
 
-            # Step 3: Stream response using RAG chain
-            from app.ai.chains.rag_chain import RAGChain
-
-            rag_chain = RAGChain(resource_id, self.vector_service)
+            # Step 2: Save the user message in the background, without running
+            # the graph; the answer is generated once, by the RAG chain below.
+            # The write is not on the path to the first token, and it still
+            # lands if streaming fails.
+            logger.info(f"[CHAT_SERVICE] Updating workflow state with user message")
+            _start_write(workflow, config, validated_input)
 
+            # Step 3: Stream response using RAG chain
             # Serialize chat history to avoid JSON serialization issues
             # Convert LangChain message objects to simple dictionaries
             serialized_history = []
             for msg in conversation_history:
                 if hasattr(msg, "content"):
                     # Determine message type
-                    from langchain_core.messages import HumanMessage, AIMessage
-
                     if isinstance(msg, HumanMessage):
                         serialized_history.append(HumanMessage(content=msg.content))
                     elif isinstance(msg, AIMessage):
@@ -361,16 +601,18 @@ class ChatService:
             # Stream directly from the RAG chain with timeout protection
             chunk_count = 0
             context = ""
-            start_time = asyncio.get_event_loop().time()
+            loop = asyncio.get_running_loop()
             timeout_seconds = 60
+            deadline = loop.time() + timeout_seconds
             source_documents = []
-            complete_response = ""  # Store complete response during streaming
+            response_parts = []  # Joined into the complete response after streaming
 
             try:
-                async for chunk in rag_chain.astream(input_data):
+                async for chunk in rag_chain.astream(
+                    input_data, retrieval_task=retrieval_task
+                ):
                     # Check timeout
-                    current_time = asyncio.get_event_loop().time()
-                    if current_time - start_time > timeout_seconds:
+                    if loop.time() > deadline:
                         logger.error(
                             f"[CHAT_SERVICE] Streaming timeout after {timeout_seconds} seconds"
                         )
@@ -385,7 +627,7 @@ class ChatService:
 
                     if content:
                         # Accumulate complete response for workflow update
-                        complete_response += content
+                        response_parts.append(content)
 
                         yield {
                             "content": content,
@@ -411,33 +653,22 @@ class ChatService:
                 return
 
             # Step 4: Update workflow state with the complete AI response
-            if thread_id and complete_response:
-                try:
-                    # Create AI message for workflow state update
-                    from langchain_core.messages import AIMessage
-
-                    ai_message = AIMessage(content=complete_response)
-
-                    # Add AI message to conversation history
-                    conversation_history.append(ai_message)
-
-                    # Update workflow state with the complete conversation
-                    logger.info(
-                        f"[CHAT_SERVICE] Updating workflow state with AI response (length: {len(complete_response)})"
-                    )
-
-                    # The workflow state is already updated with user message,
-                    # so we just need to ensure the AI response is also saved
-                    # This is handled automatically by the workflow's state management
-
-                    logger.info(
-                        f"[CHAT_SERVICE] Workflow state update completed for thread_id: {thread_id}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"[CHAT_SERVICE] Could not update workflow state: {str(e)}"
-                    )
-                    # Don't fail the streaming if workflow update fails
+            complete_response = "".join(response_parts)
+            if complete_response:
+                logger.info(
+                    f"[CHAT_SERVICE] Updating workflow state with AI response (length: {len(complete_response)})"
+                )
+                # Queued behind the user message so the turns stay in order;
+                # the final chunk only goes out once the answer is saved
+                _start_write(
+                    workflow,
+                    config,
+                    {
+                        "messages": [AIMessage(content=complete_response)],
+                        "answer": complete_response,
+                    },
+                )
+                await _wait_for_thread_writes(thread_id or "default")
 
             # Send final chunk with full context
             final_chunk = {
@@ -452,6 +683,7 @@ class ChatService:
             logger.error(
                 f"[CHAT_SERVICE] Failed to process chat message for resource {resource_id}: {str(e)}"
             )
+            self._discard_workflow(e)
             raise RuntimeError(f"Failed to process chat message: {str(e)}")
 
     async def get_conversation_history(
@@ -469,116 +701,33 @@ class ChatService:
         Returns:
             List of conversation messages with role and content
         """
-        try:
-            # Get workflow to access conversation history
-            workflow = await self._get_workflow(resource_id, async_mode=True)
+        # A turn still being saved would otherwise be missing from the history
+        await _wait_for_thread_writes(thread_id)
 
-            # Prepare config to get current state
-            config = prepare_rag_chat_config(thread_id)
+        if _is_known_empty(thread_id):
+            return []
 
-            # Get current state (this will load existing conversation)
-            current_state = await workflow.aget_state(config)
+        try:
+            # The cached workflow only supplies its checkpointer; history is
+            # read from the latest checkpoint without running the graph
+            workflow = await self._get_workflow(resource_id, async_mode=True)
+            read_generation = _write_generation
+            messages = await self._checkpointer_service.aget_messages(
+                workflow.checkpointer, thread_id
+            )
 
-            if current_state:
-                # Check if messages are in state.values
-                if (
-                    hasattr(current_state, "values")
-                    and "messages" in current_state.values
-                ):
-                    messages = current_state.values["messages"]
-
-                    # Convert LangGraph messages to simple format
-                    history = []
-                    for message in messages:
-
-                        # Get message content
-                        content = getattr(message, "content", "")
-                        if not content:
-                            logger.info(
-                                f"[CHAT_SERVICE] Message has no content: {message}"
-                            )
-                            continue
-
-                        # Determine message role
-                        if isinstance(message, HumanMessage):
-                            role = "human"
-                        elif isinstance(message, AIMessage):
-                            role = "assistant"
-                        elif hasattr(message, "type"):
-                            role = "human" if message.type == "human" else "assistant"
-                        else:
-                            role = "unknown"
-                            logger.info(
-                                f"[CHAT_SERVICE] Unknown message type: {type(message)}"
-                            )
-
-                        history.append(
-                            {
-                                "role": role,
-                                "content": content,
-                                "timestamp": getattr(
-                                    message, "additional_kwargs", {}
-                                ).get("timestamp", None),
-                            }
-                        )
-                    return history
-                elif hasattr(current_state, "messages"):
-                    # Fallback to direct messages attribute
-                    messages = current_state.messages
-
-                    # Convert LangGraph messages to simple format
-                    history = []
-                    for message in messages:
-
-                        # Get message content
-                        content = getattr(message, "content", "")
-                        if not content:
-                            logger.info(
-                                f"[CHAT_SERVICE] Message has no content: {message}"
-                            )
-                            continue
-
-                        # Determine message role
-                        if isinstance(message, HumanMessage):
-                            role = "human"
-                        elif isinstance(message, AIMessage):
-                            role = "assistant"
-                        elif hasattr(message, "type"):
-                            role = "human" if message.type == "human" else "assistant"
-                        else:
-                            role = "unknown"
-                            logger.info(
-                                f"[CHAT_SERVICE] Unknown message type: {type(message)}"
-                            )
-                        history.append(
-                            {
-                                "role": role,
-                                "content": content,
-                                "timestamp": getattr(
-                                    message, "additional_kwargs", {}
-                                ).get("timestamp", None),
-                            }
-                        )
-                    return history
-                else:
-                    logger.info(
-                        f"[CHAT_SERVICE] No 'messages' found in state.values or direct attribute"
-                    )
-                    logger.info(
-                        f"[CHAT_SERVICE] Available keys in state.values: {list(current_state.values.keys()) if hasattr(current_state, 'values') else 'No values attribute'}"
-                    )
-            else:
+            if not messages:
                 logger.info(
-                    f"[CHAT_SERVICE] No current state found for thread {thread_id}"
+                    f"[CHAT_SERVICE] No conversation history found for thread {thread_id}"
                 )
+                _mark_thread_empty(thread_id, read_generation)
+                return []
 
-            logger.info(
-                f"[CHAT_SERVICE] No conversation history found for thread {thread_id}"
-            )
-            return []
+            return _messages_to_history(messages)
 
         except Exception as e:
             logger.error(f"[CHAT_SERVICE] Failed to get conversation history: {str(e)}")
+            self._discard_workflow(e)
             return []
 
     async def clear_conversation_history(self, thread_id: str) -> None:
@@ -588,6 +737,8 @@ class ChatService:
         Returns True on success, False otherwise.
         """
         try:
+            # A turn still being saved would otherwise reappear after the delete
+            await _wait_for_thread_writes(thread_id)
             return await self._checkpointer_service.delete_postgres_checkpointer(
                 thread_id
             )
@@ -8,15 +8,75 @@ Uses proper PostgreSQL checkpointer patterns from LangGraph documentation.
 Uses shared connection pool to prevent pool proliferation.
 """
 
-from typing import Optional, Union
+import asyncio
+from typing import Dict, Optional, Union
 from langgraph.checkpoint.memory import MemorySaver
+from psycopg.rows import tuple_row
+from psycopg_pool import PoolTimeout
 from app.core.config import settings
 from app.ai.services.engine_service import get_shared_pg_engine
-from app.ai.services.shared_pool_service import get_shared_async_pool
+from app.ai.services.shared_pool_service import (
+    get_shared_async_pool,
+    reset_shared_pool,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a pooled connection before treating the pool as stuck
+POOL_ACQUIRE_TIMEOUT_SECONDS = 5.0
+
+# Tables LangGraph's PostgreSQL checkpointer creates in setup()
+CHECKPOINTER_TABLES = (
+    "checkpoints",
+    "checkpoint_blobs",
+    "checkpoint_migrations",
+    "checkpoint_writes",
+)
+
+
+async def _fetch_existing_checkpointer_tables(conn) -> set:
+    """
+    Look up which checkpointer tables exist, in a single catalog query.
+
+    to_regclass resolves each name through the pg_class syscache instead of
+    going through the information_schema.tables view.
+
+    Args:
+        conn: Open async connection
+
+    Returns:
+        set: Names from CHECKPOINTER_TABLES that exist in the public schema
+    """
+    # The shared pool hands out dict_row connections; plain tuples are enough here
+    async with conn.cursor(row_factory=tuple_row) as cursor:
+        await cursor.execute(
+            """
+            SELECT table_name FROM unnest(%s::text[]) AS table_name
+            WHERE to_regclass('public.' || quote_ident(table_name)) IS NOT NULL
+            """,
+            (list(CHECKPOINTER_TABLES),),
+        )
+        rows = await cursor.fetchall()
+    return {row[0] for row in rows}
+
+
+def _reset_pool_on_timeout(error: Exception) -> None:
+    """Reset the shared pool when a connection could not be acquired in time."""
+    if isinstance(error, PoolTimeout) or "couldn't get a connection" in str(error).lower():
+        logger.warning("[CHECKPOINTER_SERVICE] Pool timeout detected, resetting pool...")
+        reset_shared_pool()
+        CheckpointerService._tables_verified = False
+        # Checkpointers built so far, and the workflows compiled with them,
+        # hold the old pool
+        if CheckpointerService._instance is not None:
+            CheckpointerService._instance._checkpointers.clear()
+        # Lazy import to avoid circular dependency
+        from app.ai.services.chat_service import clear_workflow_cache
+
+        clear_workflow_cache()
+
+
 class CheckpointerService:
     """
     Service for managing LangGraph checkpointers.
@@ -32,6 +92,10 @@ class CheckpointerService:
     # Singleton pattern to prevent multiple instances
     _instance = None
 
+    # Set once all checkpointer tables have been seen; they are never dropped
+    # at runtime, so only negative results are checked again
+    _tables_verified: bool = False
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -46,6 +110,12 @@ class CheckpointerService:
             return
 
         self._postgres_available = None
+
+        # PostgreSQL checkpointers built so far, keyed by async_mode; the lock
+        # keeps concurrent first callers from each building one
+        self._checkpointers: Dict[bool, Union["PostgresSaver", "AsyncPostgresSaver"]] = {}
+        self._checkpointer_lock = asyncio.Lock()
+
         self._initialized = True
 
         logger.info("[CHECKPOINTER_SERVICE] Initialized singleton CheckpointerService")
@@ -60,6 +130,9 @@ class CheckpointerService:
         Returns:
             bool: True if all required tables exist, False otherwise
         """
+        if CheckpointerService._tables_verified:
+            return True
+
         try:
             # Get shared async pool
             logger.info(
@@ -69,102 +142,85 @@ class CheckpointerService:
                 "[CHECKPOINTER_SERVICE] Got shared async pool, checking tables...")
 
             # Check if all required tables exist
-            async with shared_pool.connection() as conn:
+            async with shared_pool.connection(
+                timeout=POOL_ACQUIRE_TIMEOUT_SECONDS
+            ) as conn:
                 logger.info(
                     "[CHECKPOINTER_SERVICE] Database connection established")
 
-                async with conn.cursor() as cursor:
+                # Check for all four required tables in one round-trip
+                existing = await _fetch_existing_checkpointer_tables(conn)
+                missing = [t for t in CHECKPOINTER_TABLES if t not in existing]
+                if missing:
                     logger.info(
-                        "[CHECKPOINTER_SERVICE] Cursor created, checking tables...")
-
-                    # Check for all four required tables
-                    tables_to_check = [
-                        'checkpoints',
-                        'checkpoint_blobs',
-                        'checkpoint_migrations',
-                        'checkpoint_writes'
-                    ]
-
-                    for table_name in tables_to_check:
-                        logger.info(
-                            f"[CHECKPOINTER_SERVICE] Checking table: {table_name}")
-
-                        try:
-                            await cursor.execute("""
-                                SELECT EXISTS (
-                                    SELECT FROM information_schema.tables 
-                                    WHERE table_schema = 'public' 
-                                    AND table_name = %s
-                                )
-                            """, (table_name,))
-
-                            exists = await cursor.fetchone()
-                            logger.info(
-                                f"[CHECKPOINTER_SERVICE] Table '{table_name}' exists: {exists}")
-
-                            # Handle both dict and tuple return types from different psycopg versions
-                            if isinstance(exists, dict):
-                                # psycopg3 with dict_row factory
-                                exists_value = exists.get('exists', False)
-                            else:
-                                # psycopg2 or other drivers return tuples
-                                exists_value = exists[0] if exists else False
-
-                            logger.info(
-                                f"[CHECKPOINTER_SERVICE] Table '{table_name}' exists value: {exists_value}")
-
-                            if not exists_value:
-                                logger.info(
-                                    f"[CHECKPOINTER_SERVICE] Table '{table_name}' does not exist")
-                                return False
-
-                        except Exception as table_check_error:
-                            logger.error(
-                                f"[CHECKPOINTER_SERVICE] Error checking table '{table_name}': {str(table_check_error)}")
-                            return False
+                        f"[CHECKPOINTER_SERVICE] Tables do not exist: {', '.join(missing)}")
+                    return False
 
-                    logger.info(
-                        "[CHECKPOINTER_SERVICE] All checkpointer tables already exist")
-                    return True
+                logger.info(
+                    "[CHECKPOINTER_SERVICE] All checkpointer tables already exist")
+                CheckpointerService._tables_verified = True
+                return True
 
         except Exception as e:
             logger.error(
                 f"[CHECKPOINTER_SERVICE] Error checking table existence: {str(e)}")
             logger.error(f"[CHECKPOINTER_SERVICE] Error type: {type(e)}")
-            import traceback
-            logger.error(
-                f"[CHECKPOINTER_SERVICE] Traceback: {traceback.format_exc()}")
-            
-             # CRITICAL: Reset pool on timeout to prevent deadlock
-            if "couldn't get a connection" in str(e).lower():
-                logger.warning("[CHECKPOINTER_SERVICE] Pool timeout detected, resetting pool...")
-                from app.ai.services.shared_pool_service import reset_shared_pool
-                reset_shared_pool()
+            # The traceback is only formatted when a DEBUG handler emits it
+            logger.debug(
+                "[CHECKPOINTER_SERVICE] Traceback for table check error", exc_info=True)
+
+            # CRITICAL: Reset pool on timeout to prevent deadlock
+            _reset_pool_on_timeout(e)
             # If we can't check, assume tables don't exist and proceed with setup
             return False
 
+    def reset_on_pool_timeout(self, error: Exception) -> None:
+        """
+        Reset the shared pool and drop cached checkpointers if the error was
+        a pool timeout, so the next call builds them on a fresh pool.
+
+        Args:
+            error: Error raised by a call that used a checkpointer
+        """
+        _reset_pool_on_timeout(error)
+
     async def create_checkpointer(
         self, async_mode: bool = False
     ) -> Union["PostgresSaver", "AsyncPostgresSaver", "MemorySaver"]:
         """
         Create a checkpointer instance with PostgreSQL preferred, memory fallback.
 
+        A PostgreSQL checkpointer is built once per mode and reused; a memory
+        fallback is not kept, so the next call tries PostgreSQL again.
+
         Args:
             async_mode: If True, create AsyncPostgresSaver, else PostgresSaver
 
         Returns:
             PostgresSaver/AsyncPostgresSaver if database available, MemorySaver as fallback
         """
+        checkpointer = self._checkpointers.get(async_mode)
+        if checkpointer is not None:
+            return checkpointer
 
-        logger.info(
-            f"[CHECKPOINTER_SERVICE] Creating {'async' if async_mode else 'sync'} PostgreSQL checkpointer"
-        )
+        async with self._checkpointer_lock:
+            # Another caller may have built it while we waited
+            checkpointer = self._checkpointers.get(async_mode)
+            if checkpointer is not None:
+                return checkpointer
 
-        # Try PostgreSQL checkpointer first
-        if async_mode:
-            checkpointer = await self._create_async_postgres_checkpointer()
-        else:
-            checkpointer = self._create_postgres_checkpointer()
+            logger.info(
+                f"[CHECKPOINTER_SERVICE] Creating {'async' if async_mode else 'sync'} PostgreSQL checkpointer"
+            )
+
+            # Try PostgreSQL checkpointer first
+            if async_mode:
+                checkpointer = await self._create_async_postgres_checkpointer()
+            else:
+                checkpointer = self._create_postgres_checkpointer()
+
+            if checkpointer:
+                self._checkpointers[async_mode] = checkpointer
 
         if not checkpointer:
             # Fallback to memory checkpointer
@@ -215,10 +271,11 @@ class CheckpointerService:
             if await self._check_checkpointer_tables_exist():
                 logger.info(
                     "[CHECKPOINTER_SERVICE] Tables already exist, skipping setup() call")
-            else:
-                logger.info(
-                    "[CHECKPOINTER_SERVICE] Tables don't exist, calling setup() to create them...")
+                self._postgres_available = True
+                return checkpointer
 
+            logger.info(
+                "[CHECKPOINTER_SERVICE] Tables don't exist, calling setup() to create them...")
 
             # Setup the checkpointer (create tables) - REQUIRED by LangGraph
             try:
@@ -227,8 +284,6 @@ class CheckpointerService:
                 )
 
                 # Add timeout to prevent indefinite hanging
-                import asyncio
-
                 async def setup_with_logging():
                     logger.info("[CHECKPOINTER_SERVICE] Calling checkpointer.setup()...")
                     await checkpointer.setup()
@@ -390,6 +445,29 @@ class CheckpointerService:
         else:
             return "Unknown"
 
+    async def aget_messages(self, checkpointer, thread_id: str) -> list:
+        """
+        Read a thread's messages straight from its latest checkpoint.
+
+        Skips the graph-level state reconstruction of aget_state(), which a
+        read-only history fetch does not need.
+
+        Args:
+            checkpointer: Checkpointer instance
+            thread_id: Conversation thread ID
+
+        Returns:
+            Messages of the latest checkpoint, or [] if the thread has none
+        """
+        checkpoint_tuple = await checkpointer.aget_tuple(
+            {"configurable": {"thread_id": thread_id}}
+        )
+        if checkpoint_tuple is None:
+            return []
+        return checkpoint_tuple.checkpoint.get("channel_values", {}).get(
+            "messages", []
+        )
+
     async def debug_checkpointer_tables(self) -> dict:
         """
         Debug method to check the status of all checkpointer tables.
@@ -404,83 +482,37 @@ class CheckpointerService:
             logger.info(
                 "[CHECKPOINTER_SERVICE] Debug: Got shared pool, testing connection...")
 
-            # Test basic connection first
+            # Probe the tables; a failure here means the connection is not usable
             try:
-                async with shared_pool.connection() as conn:
+                async with shared_pool.connection(
+                    timeout=POOL_ACQUIRE_TIMEOUT_SECONDS
+                ) as conn:
                     logger.info(
                         "[CHECKPOINTER_SERVICE] Debug: Connection established successfully")
 
-                    # Test a simple query
-                    async with conn.cursor() as cursor:
-                        await cursor.execute("SELECT 1")
-                        result = await cursor.fetchone()
-                        logger.info(
-                            f"[CHECKPOINTER_SERVICE] Debug: Simple query result: {result}")
-
-                        if result and result[0] == 1:
-                            logger.info(
-                                "[CHECKPOINTER_SERVICE] Debug: Basic database connectivity confirmed")
-                        else:
-                            logger.error(
-                                "[CHECKPOINTER_SERVICE] Debug: Basic query failed")
-                            return {"error": "Basic query failed", "status": "error"}
-
-                    # Now check tables
-                    async with conn.cursor() as cursor:
-                        tables_to_check = [
-                            'checkpoints',
-                            'checkpoint_blobs',
-                            'checkpoint_migrations',
-                            'checkpoint_writes'
-                        ]
-
-                        table_status = {}
-                        all_exist = True
-
-                        for table_name in tables_to_check:
-                            logger.info(
-                                f"[CHECKPOINTER_SERVICE] Debug: Checking table {table_name}")
-
-                            try:
-                                await cursor.execute("""
-                                    SELECT EXISTS (
-                                        SELECT FROM information_schema.tables 
-                                        WHERE table_schema = 'public' 
-                                        AND table_name = %s
-                                    )
-                                """, (table_name,))
-
-                                exists = await cursor.fetchone()
-
-                                # Handle both dict and tuple return types
-                                if isinstance(exists, dict):
-                                    exists_value = exists.get('exists', False)
-                                else:
-                                    exists_value = exists[0] if exists else False
-
-                                table_status[table_name] = exists_value
-                                logger.info(
-                                    f"[CHECKPOINTER_SERVICE] Debug: Table {table_name} exists: {table_status[table_name]}")
-
-                                if not exists_value:
-                                    all_exist = False
-
-                            except Exception as table_error:
-                                logger.error(
-                                    f"[CHECKPOINTER_SERVICE] Debug: Error checking table {table_name}: {str(table_error)}")
-                                table_status[table_name] = False
-                                all_exist = False
-
-                        return {
-                            "tables": table_status,
-                            "all_tables_exist": all_exist,
-                            "status": "ready" if all_exist else "missing_tables",
-                            "connection": "working"
-                        }
+                    # The table probe doubles as the connectivity check; if it
+                    # raises, the connection error below is reported
+                    existing = await _fetch_existing_checkpointer_tables(conn)
+
+                    table_status = {
+                        table_name: table_name in existing
+                        for table_name in CHECKPOINTER_TABLES
+                    }
+                    all_exist = all(table_status.values())
+                    logger.info(
+                        f"[CHECKPOINTER_SERVICE] Debug: Table status: {table_status}")
+
+                    return {
+                        "tables": table_status,
+                        "all_tables_exist": all_exist,
+                        "status": "ready" if all_exist else "missing_tables",
+                        "connection": "working"
+                    }
 
             except Exception as conn_error:
                 logger.error(
                     f"[CHECKPOINTER_SERVICE] Debug: Connection error: {str(conn_error)}")
+                _reset_pool_on_timeout(conn_error)
                 return {"error": f"Connection failed: {str(conn_error)}", "status": "error"}
 
         except Exception as e:
@@ -507,7 +539,9 @@ class CheckpointerService:
             logger.info("[CHECKPOINTER_SERVICE] Got shared pool")
 
             # Test connection
-            async with shared_pool.connection() as conn:
+            async with shared_pool.connection(
+                timeout=POOL_ACQUIRE_TIMEOUT_SECONDS
+            ) as conn:
                 logger.info("[CHECKPOINTER_SERVICE] Connection established")
 
                 # Test simple query
@@ -526,6 +560,7 @@ class CheckpointerService:
         except Exception as e:
             logger.error(
                 f"[CHECKPOINTER_SERVICE] Connection test failed: {str(e)}")
+            _reset_pool_on_timeout(e)
             return {
                 "status": "failed",
                 "error": str(e),
@@ -0,0 +1,59 @@
+"""
+Process-local cache for retrieved RAG context.
+
+The formatted context can be tens of thousands of characters. Keeping it in
+RAGChatState would write it to the checkpointer on every turn even though no
+later turn reads it, so the graph state carries only a short reference and
+the text itself lives here until the caller picks it up.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Most recent contexts kept per process; callers read theirs right after the
+# workflow returns, so this only needs to cover requests in flight
+CONTEXT_CACHE_MAX_ENTRIES = 256
+
+# Global shared cache, oldest entries first
+_context_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def store_context(context: str) -> str:
+    """
+    Store a retrieved context and return the reference kept in graph state.
+
+    Args:
+        context: Formatted context string
+
+    Returns:
+        str: Reference to pass to get_context()
+    """
+    context_ref = uuid4().hex
+    _context_cache[context_ref] = context
+    if len(_context_cache) > CONTEXT_CACHE_MAX_ENTRIES:
+        _context_cache.popitem(last=False)
+    return context_ref
+
+
+def get_context(context_ref: Optional[str]) -> str:
+    """
+    Get a stored context by reference.
+
+    Args:
+        context_ref: Reference returned by store_context()
+
+    Returns:
+        str: Context string, or "" if the reference is unknown or evicted
+    """
+    if not context_ref:
+        return ""
+
+    context = _context_cache.get(context_ref)
+    if context is None:
+        logger.warning(f"[CONTEXT_CACHE_SERVICE] Context {context_ref} not found")
+        return ""
+    return context
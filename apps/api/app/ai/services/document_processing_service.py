@@ -5,15 +5,68 @@ This service handles workflow execution, status tracking, and error management
 while integrating with existing business services.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+import threading
+from typing import Awaitable, Dict, Any, List, Optional, Tuple, TypeVar
 from uuid import UUID
-import asyncio
+import uvloop
 
-from apps.api.app.ai.schemas.workflow_states import DocumentProcessingState
+from app.ai.schemas.workflow_states import (
+    DocumentProcessingState,
+    DocumentProcessingStateList,
+    ProcessingStatus,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Long-lived event loop for the sync entry points, created on first use so
+# each forked Celery child starts its own thread
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the shared background event loop, starting it on first use.
+
+    Returns:
+        asyncio.AbstractEventLoop: Running uvloop event loop
+    """
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                loop = uvloop.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="document-processing-loop",
+                    daemon=True,
+                ).start()
+                _background_loop = loop
+                logger.info(
+                    "[DOCUMENT_PROCESSING_SERVICE] Started background event loop"
+                )
+    return _background_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    Reusing one loop keeps loop-bound clients and pooled connections warm
+    across tasks instead of building and closing a loop for every call.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
 
 class DocumentProcessingService:
     """
@@ -58,15 +111,12 @@ class DocumentProcessingService:
                 f"[DOCUMENT_PROCESSING_SERVICE] Starting document processing for file {file_key}"
             )
 
-            # Create the LangGraph workflow (lazy import to avoid circular dependency)
-            logger.info(
-                f"[DOCUMENT_PROCESSING_SERVICE] Creating document processing workflow"
-            )
+            # Reuse the compiled LangGraph workflow (lazy import to avoid circular dependency)
             from app.ai.workflows.document_processing_workflow import (
-                create_document_processing_workflow,
+                get_document_processing_workflow_instance,
             )
 
-            workflow = create_document_processing_workflow()
+            workflow = get_document_processing_workflow_instance()
 
             # Initialize state with all required fields
             logger.info(
@@ -77,26 +127,28 @@ class DocumentProcessingService:
             initial_state = DocumentProcessingState(
                 resource_id=resource_id,
                 file_key=file_key,
-                status="pending",
+                status=ProcessingStatus.PENDING,
             )
 
-            # Convert to dict and add only data (no service instances)
-            state_dict = initial_state.model_dump()
+            # Convert to dict and add only data (no service instances); unset
+            # optional fields stay out of the graph's channels entirely
+            state_dict = initial_state.model_dump(exclude_none=True)
 
             # Debug: Log what we're preparing
-            logger.info(f"[DOCUMENT_PROCESSING_SERVICE] Input data: {state_dict}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[DOCUMENT_PROCESSING_SERVICE] Input data: {state_dict}")
 
-            # Run the LangGraph workflow directly
+            # Run the LangGraph workflow directly (ainvoke: embedder node is async)
             logger.info(
                 f"[DOCUMENT_PROCESSING_SERVICE] Invoking LangGraph workflow for file {file_key}"
             )
-            final_state = workflow.invoke(state_dict)
+            final_state = await workflow.ainvoke(state_dict)
             logger.info(
                 f"[DOCUMENT_PROCESSING_SERVICE] Workflow completed with status: {final_state.get('status')}"
             )
             
             # Update final status based on result
-            if final_state.get("status") == "embeddings_stored":
+            if final_state.get("status") == ProcessingStatus.EMBEDDINGS_STORED:
                 # Successful completion - embeddings were stored
                 return {
                     "success": True,
@@ -132,4 +184,95 @@ class DocumentProcessingService:
         Returns:
             Processing result with status and metadata
         """
-        return asyncio.run(self.process_document_async(resource_id, user_id, file_key))
+        return run_sync(self.process_document_async(resource_id, user_id, file_key))
+
+    async def process_documents_async(
+        self, items: List[Tuple[UUID, UUID, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several documents in one workflow run.
+
+        Files are fetched, parsed and chunked concurrently and their chunks
+        are embedded together, so the files share embedding requests.
+
+        Args:
+            items: (resource_id, user_id, file_key) for each file to process
+
+        Returns:
+            One processing result per item, in the same order
+
+        Raises:
+            ValueError: If a user id or file key is missing
+            RuntimeError: If workflow execution fails
+        """
+        try:
+            for resource_id, user_id, file_key in items:
+                if not user_id:
+                    raise ValueError(f"User id not found")
+                if not file_key:
+                    raise ValueError(f"File key not found or not authorized")
+
+            logger.info(
+                f"[DOCUMENT_PROCESSING_SERVICE] Starting batch processing of {len(items)} files"
+            )
+
+            # Lazy import to avoid circular dependency
+            from app.ai.workflows.batch_ingest_workflow import (
+                get_batch_ingest_workflow_instance,
+            )
+
+            workflow = get_batch_ingest_workflow_instance()
+
+            # One validation pass for the whole batch; the graph gets plain dicts
+            files = DocumentProcessingStateList.dump_python(
+                DocumentProcessingStateList.validate_python(
+                    [
+                        {"resource_id": resource_id, "file_key": file_key}
+                        for resource_id, _, file_key in items
+                    ]
+                ),
+                exclude_none=True,
+            )
+
+            final_state = await workflow.ainvoke({"files": files})
+
+            results = []
+            for (resource_id, _, _), file_state in zip(items, final_state["files"]):
+                success = file_state.get("status") == ProcessingStatus.EMBEDDINGS_STORED
+                results.append(
+                    {
+                        "success": success,
+                        "resource_id": resource_id,
+                        "status": "completed" if success else "failed",
+                        "message": (
+                            "Document processing completed successfully"
+                            if success
+                            else file_state.get(
+                                "error_message", "Document processing failed"
+                            )
+                        ),
+                        "file_type": file_state.get("file_type"),
+                    }
+                )
+
+            logger.info(
+                f"[DOCUMENT_PROCESSING_SERVICE] Batch completed: {sum(r['success'] for r in results)} of {len(results)} files succeeded"
+            )
+            return results
+
+        except Exception as e:
+            raise RuntimeError(f"Batch document processing failed: {str(e)}")
+
+    def process_documents_sync(
+        self, items: List[Tuple[UUID, UUID, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several documents synchronously (blocking).
+
+        Args:
+            items: (resource_id, user_id, file_key) for each file to process
+
+        Returns:
+            One processing result per item, in the same order
+        """
+        return run_sync(self.process_documents_async(items))
@@ -0,0 +1,146 @@
+"""
+Embedding cache service keyed by chunk content hash.
+
+Lets re-uploads and edited documents reuse embeddings for unchanged text
+instead of paying for another OpenAI call.
+"""
+
+import hashlib
+import json
+from typing import Dict, List
+from app.ai.services.shared_pool_service import get_shared_async_pool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Entries not read or written for this long are removed by aprune
+EMBEDDING_CACHE_MAX_AGE_DAYS = 90
+
+# last_used_at is refreshed at most this often, so hot entries are not
+# rewritten on every lookup
+EMBEDDING_CACHE_TOUCH_INTERVAL_HOURS = 24
+
+
+class EmbeddingCacheService:
+    """
+    Service for reading and writing cached embeddings.
+
+    Backed by the embedding_cache table on the shared async pool; entries are
+    keyed by (blake2b content hash, embedding model). Lookups refresh an
+    entry's last_used_at, and aprune drops entries that went unused.
+    """
+
+    def __init__(self, model: str = "text-embedding-3-small"):
+        """
+        Initialize embedding cache service.
+
+        Args:
+            model: Embedding model the cached vectors belong to
+        """
+        self.model = model
+
+    @staticmethod
+    def content_hash(text: str) -> bytes:
+        """
+        Compute the cache key for a chunk's text.
+
+        Args:
+            text: Chunk content
+
+        Returns:
+            16-byte blake2b digest
+        """
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    async def aget_many(self, hashes: List[bytes]) -> Dict[bytes, List[float]]:
+        """
+        Fetch cached embeddings for the given hashes in one round-trip.
+
+        Hits whose last_used_at is older than the touch interval are
+        refreshed in the same statement.
+
+        Args:
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of hash to embedding for every cache hit
+        """
+        if not hashes:
+            return {}
+
+        shared_pool = await get_shared_async_pool()
+        async with shared_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    WITH touched AS (
+                        UPDATE embedding_cache SET last_used_at = now()
+                        WHERE model = %(model)s AND content_hash = ANY(%(hashes)s)
+                        AND last_used_at < now() - make_interval(hours => %(touch_hours)s)
+                    )
+                    SELECT content_hash, embedding::text AS embedding
+                    FROM embedding_cache
+                    WHERE model = %(model)s AND content_hash = ANY(%(hashes)s)
+                    """,
+                    {
+                        "model": self.model,
+                        "hashes": list(set(hashes)),
+                        "touch_hours": EMBEDDING_CACHE_TOUCH_INTERVAL_HOURS,
+                    },
+                )
+                rows = await cursor.fetchall()
+
+        return {bytes(row["content_hash"]): json.loads(row["embedding"]) for row in rows}
+
+    async def aput_many(self, embeddings: Dict[bytes, List[float]]) -> None:
+        """
+        Store newly computed embeddings; existing entries are left untouched.
+
+        Args:
+            embeddings: Mapping of content hash to embedding
+        """
+        if not embeddings:
+            return
+
+        shared_pool = await get_shared_async_pool()
+        async with shared_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(
+                    """
+                    INSERT INTO embedding_cache (content_hash, model, embedding)
+                    VALUES (%s, %s, %s::vector)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [
+                        (content_hash, self.model, str(embedding))
+                        for content_hash, embedding in embeddings.items()
+                    ],
+                )
+
+        logger.info(f"[EMBEDDING_CACHE_SERVICE] Cached {len(embeddings)} new embeddings")
+
+    @staticmethod
+    async def aprune(max_age_days: int = EMBEDDING_CACHE_MAX_AGE_DAYS) -> int:
+        """
+        Delete cache entries for all models that have not been used recently.
+
+        Args:
+            max_age_days: Entries unused for longer than this are deleted
+
+        Returns:
+            Number of entries deleted
+        """
+        shared_pool = await get_shared_async_pool()
+        async with shared_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    DELETE FROM embedding_cache
+                    WHERE last_used_at < now() - make_interval(days => %s)
+                    """,
+                    (max_age_days,),
+                )
+                deleted = cursor.rowcount
+
+        logger.info(f"[EMBEDDING_CACHE_SERVICE] Pruned {deleted} unused embeddings")
+        return deleted
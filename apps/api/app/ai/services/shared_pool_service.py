@@ -5,8 +5,9 @@ This service provides a single AsyncConnectionPool instance that all
 checkpointers can share, eliminating connection pool proliferation.
 """
 
+import threading
 from typing import Optional
-from psycopg_pool import AsyncConnectionPool
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 from psycopg.rows import dict_row
 from app.core.config import settings
 from app.ai.services.engine_service import get_shared_pg_engine
@@ -17,6 +18,10 @@ logger = logging.getLogger(__name__)
 # Global shared pool instance
 _shared_async_pool: Optional[AsyncConnectionPool] = None
 
+# Global shared sync pool instance, for code paths that cannot await
+_shared_sync_pool: Optional[ConnectionPool] = None
+_shared_sync_pool_lock = threading.Lock()
+
 
 async def get_shared_async_pool() -> AsyncConnectionPool:
     """
@@ -76,6 +81,52 @@ async def get_shared_async_pool() -> AsyncConnectionPool:
     return _shared_async_pool
 
 
+def get_shared_sync_pool() -> ConnectionPool:
+    """
+    Get shared sync ConnectionPool instance for blocking callers.
+
+    The async pool is bound to the event loop it was opened on, so sync
+    code running in worker threads gets its own small pool with the same
+    connection settings.
+
+    Returns:
+        ConnectionPool: Shared sync pool instance
+
+    Raises:
+        RuntimeError: If pool creation fails
+    """
+    global _shared_sync_pool
+
+    if _shared_sync_pool is None:
+        with _shared_sync_pool_lock:
+            if _shared_sync_pool is None:
+                try:
+                    logger.info("[SHARED_POOL_SERVICE] Creating shared sync ConnectionPool")
+                    pool = ConnectionPool(
+                        conninfo=_get_connection_string(),
+                        max_size=5,
+                        min_size=1,
+                        timeout=30,
+                        max_idle=600,
+                        kwargs={"autocommit": True, "row_factory": dict_row},
+                        open=False,
+                    )
+                    pool.open()
+                    _shared_sync_pool = pool
+                    logger.info(
+                        "[SHARED_POOL_SERVICE] Sync ConnectionPool opened with max_size=5, min_size=1"
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"[SHARED_POOL_SERVICE] Failed to create shared sync ConnectionPool: {str(e)}"
+                    )
+                    raise RuntimeError(
+                        f"Failed to create shared sync ConnectionPool: {str(e)}"
+                    )
+
+    return _shared_sync_pool
+
+
 def _get_connection_string() -> str:
     """
     Get PostgreSQL connection string for the shared pool.
@@ -1,14 +1,114 @@
-from typing import Any, List, Optional, Dict
-from uuid import UUID
+import asyncio
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, List, Optional, Dict, Tuple, Union
+from uuid import NAMESPACE_URL, UUID, uuid5
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from psycopg import sql
+from psycopg.errors import UndefinedTable
+from psycopg.types.json import Json
 from app.ai.services.engine_service import get_shared_pg_engine
-from app.ai.tools.embedding_tools import EmbeddingGenerationTool
+from app.ai.services.shared_pool_service import (
+    get_shared_async_pool,
+    get_shared_sync_pool,
+)
+from app.ai.tools.embedding_tools import get_shared_embedding_tool
 from app.core.config import settings
 from langchain_postgres import PGVectorStore
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Default number of rows written per multi-row upsert
+DEFAULT_STORE_BATCH_SIZE = 500
+
+# Default number of upsert batches in flight at once, each on its own pooled
+# connection; kept well below the shared pool's max_size
+DEFAULT_UPSERT_CONCURRENCY = 4
+
+# Number of computed embeddings returned with a storage result for analysis
+SAMPLE_EMBEDDING_COUNT = 5
+
+# Table comment marking a bulk load whose ANN index has not been rebuilt yet
+HNSW_PENDING_MARKER = "hnsw_index_pending"
+
+# Session-local table abulk_store_documents stages rows in before copying
+# them into the collection
+BULK_STAGING_TABLE = sql.Identifier("bulk_store_staging")
+
+# Candidates fetched from the fp16 ANN index per requested result before
+# exact fp32 re-ranking
+HALFVEC_RERANK_FACTOR = 4
+
+# Query embeddings kept per process; chat queries repeat within and across
+# conversations, and each miss is an OpenAI round-trip
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 2048
+
+# (model, normalized query hash) -> embedding, least recently used first
+_query_embedding_cache: "OrderedDict[Tuple[str, bytes], List[float]]" = OrderedDict()
+
+# Embedding requests in flight, so concurrent identical queries share one call
+_query_embedding_inflight: Dict[Tuple[str, bytes], "asyncio.Task[List[float]]"] = {}
+
+
+def _finish_query_embedding(
+    cache_key: Tuple[str, bytes], task: "asyncio.Task[List[float]]"
+) -> None:
+    """Move a completed query embedding from the in-flight map into the cache."""
+    _query_embedding_inflight.pop(cache_key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _cache_query_embedding(cache_key, task.result())
+
+
+def _cache_query_embedding(
+    cache_key: Tuple[str, bytes], embedding: List[float]
+) -> None:
+    """Store a query embedding, evicting the least recently used entry."""
+    _query_embedding_cache[cache_key] = embedding
+    if len(_query_embedding_cache) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+        _query_embedding_cache.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _collection_name(resource_id: UUID) -> str:
+    """Build a resource's table name once; every store and search call needs it."""
+    # Convert UUID to string and replace hyphens with underscores
+    resource_id_str = str(resource_id)
+    resource_part = f"resource_{resource_id_str.replace('-', '_')}"
+
+    # One table per resource (current/recommended)
+    return f"{resource_part}_documents"
+
+
+class HalfvecRetriever(BaseRetriever):
+    """Retriever over a resource collection through the halfvec HNSW index."""
+
+    vector_service: Any
+    resource_id: UUID
+    k: int = 5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.vector_service.similarity_search_halfvec(
+            query, self.resource_id, k=self.k
+        )
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return await self.vector_service.asimilarity_search_halfvec(
+            query, self.resource_id, k=self.k
+        )
+
+
 class VectorService:
     """
     Service for managing vector database operations.
@@ -28,7 +128,7 @@ class VectorService:
             raise ValueError("DATABASE_URL is required for vector operations")
 
         # Initialize tools for stateless operations
-        self.embedding_tool = EmbeddingGenerationTool(model="text-embedding-3-small")
+        self.embedding_tool = get_shared_embedding_tool("text-embedding-3-small")
 
         self.embeddings = self.embedding_tool.embeddings
 
@@ -46,12 +146,19 @@ class VectorService:
         Returns:
             Collection name
         """
-        # Convert UUID to string and replace hyphens with underscores
-        resource_id_str = str(resource_id)
-        resource_part = f"resource_{resource_id_str.replace('-', '_')}"
+        return _collection_name(resource_id)
+
+    def get_index_name(self, collection_name: str) -> str:
+        """
+        Get the HNSW index name for a collection table.
+
+        Args:
+            collection_name: Name of the collection/table
 
-        # One table per resource (current/recommended)
-        return f"{resource_part}_documents"
+        Returns:
+            Index name (kept under PostgreSQL's 63 character identifier limit)
+        """
+        return collection_name.replace("_documents", "_hnsw_idx")
 
     def _create_vector_store(self, collection_name: str) -> "PGVectorStore":
         """
@@ -133,6 +240,101 @@ class VectorService:
             )
             raise RuntimeError(f"Failed to get vector store: {str(e)}")
 
+    async def _aget_vector_store(self, collection_name: str) -> "PGVectorStore":
+        """
+        Async variant of _get_vector_store for use inside the event loop.
+
+        Args:
+            collection_name: Name of the collection/table
+
+        Returns:
+            PGVectorStore instance
+
+        Raises:
+            RuntimeError: If vector store creation fails
+        """
+        logger.info(
+            f"[VECTOR_SERVICE] Getting async vector store for collection: {collection_name}"
+        )
+
+        try:
+            await self._aensure_table_exists(collection_name)
+
+            vector_store = await PGVectorStore.create(
+                engine=self.engine,  # REUSE SHARED ENGINE
+                table_name=collection_name,
+                embedding_service=self.embeddings,
+            )
+
+            logger.info(
+                f"[VECTOR_SERVICE] Successfully got async vector store for {collection_name}"
+            )
+            return vector_store
+
+        except Exception as e:
+            logger.error(
+                f"[VECTOR_SERVICE] Failed to get async vector store for {collection_name}: {str(e)}"
+            )
+            raise RuntimeError(f"Failed to get vector store: {str(e)}")
+
+    async def _aensure_table_exists(self, collection_name: str) -> None:
+        """
+        Async variant of _ensure_table_exists.
+
+        Args:
+            collection_name: Name of the collection/table
+
+        Raises:
+            RuntimeError: If table creation fails for reasons other than existing table
+        """
+        try:
+            vector_size = self.embedding_tool.get_embedding_dimension()
+            try:
+                await self.engine.ainit_vectorstore_table(
+                    table_name=collection_name,
+                    vector_size=vector_size,
+                )
+                logger.info(
+                    f"[VECTOR_SERVICE] Successfully created new table: {collection_name}"
+                )
+
+                # Table is empty now, so building the index up front is cheap
+                try:
+                    shared_pool = await get_shared_async_pool()
+                    async with shared_pool.connection() as conn:
+                        await self._abuild_hnsw_index(conn, collection_name)
+                except Exception as index_error:
+                    logger.warning(
+                        f"[VECTOR_SERVICE] Failed to build HNSW index for {collection_name}: {str(index_error)}"
+                    )
+            except Exception as table_error:
+                if "already exists" in str(table_error) or "DuplicateTable" in str(
+                    table_error
+                ):
+                    logger.info(
+                        f"[VECTOR_SERVICE] Table already exists (expected): {collection_name}"
+                    )
+                else:
+                    raise table_error
+
+        except Exception as e:
+            logger.error(f"[VECTOR_SERVICE] Failed to ensure table exists: {str(e)}")
+            raise RuntimeError(f"Failed to ensure table exists: {str(e)}")
+
+    async def aensure_collection(self, resource_id: UUID) -> str:
+        """
+        Create a resource's collection table and index if missing.
+
+        Args:
+            resource_id: UUID
+
+        Returns:
+            Collection name
+        """
+        collection_name = self.get_collection_name(resource_id)
+        await self._aensure_table_exists(collection_name)
+        return collection_name
+
     def _ensure_table_exists(self, collection_name: str) -> None:
         """
         Ensure that the vector table exists for the collection.
@@ -186,6 +388,10 @@ class VectorService:
         """
         Create a retriever for document search.
 
+        Unfiltered searches go through the halfvec HNSW index, the same
+        query the async search path uses; searches with a metadata filter
+        fall back to the vector store's own retriever.
+
         Args:
             resource_id: UUID
             search_kwargs: Optional search parameters
@@ -210,6 +416,13 @@ class VectorService:
             if search_kwargs:
                 default_search_kwargs.update(search_kwargs)
 
+            if not default_search_kwargs.get("filter"):
+                return HalfvecRetriever(
+                    vector_service=self,
+                    resource_id=resource_id,
+                    k=default_search_kwargs["k"],
+                )
+
             # SERVICE RESPONSIBILITY: Create retriever using pre-created vector store
             logger.info(f"[VECTOR_SERVICE] Creating retriever using existing vector store")
             vector_store = self._get_vector_store(collection_name)
@@ -222,6 +435,46 @@ class VectorService:
             logger.error(f"[VECTOR_SERVICE] Failed to create retriever: {str(e)}")
             raise RuntimeError(f"Failed to create retriever: {str(e)}")
 
+    async def acreate_retriever(
+        self, resource_id: UUID, search_kwargs: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Async variant of create_retriever; does not block the event loop.
+
+        Args:
+            resource_id: UUID
+            search_kwargs: Optional search parameters
+
+        Returns:
+            Configured retriever for the resource
+
+        Raises:
+            RuntimeError: If retriever creation fails
+        """
+        try:
+            collection_name = self.get_collection_name(resource_id)
+            logger.info(
+                f"[VECTOR_SERVICE] Creating async retriever for collection: {collection_name}"
+            )
+
+            default_search_kwargs = {"search_type": "similarity", "k": 5}
+            if search_kwargs:
+                default_search_kwargs.update(search_kwargs)
+
+            if not default_search_kwargs.get("filter"):
+                return HalfvecRetriever(
+                    vector_service=self,
+                    resource_id=resource_id,
+                    k=default_search_kwargs["k"],
+                )
+
+            vector_store = await self._aget_vector_store(collection_name)
+            return vector_store.as_retriever(search_kwargs=default_search_kwargs)
+
+        except Exception as e:
+            logger.error(f"[VECTOR_SERVICE] Failed to create retriever: {str(e)}")
+            raise RuntimeError(f"Failed to create retriever: {str(e)}")
+
     def similarity_search(
         self,
         query: str,
@@ -253,6 +506,10 @@ class VectorService:
             # SERVICE RESPONSIBILITY: Prepare search filter (no resource_id needed due to table isolation)
             search_filter = filter_dict if filter_dict else None
 
+            # Unfiltered searches use the halfvec index like the async path
+            if search_filter is None:
+                return self.similarity_search_halfvec(query, resource_id, k=k)
+
             # SERVICE RESPONSIBILITY: Perform search using pre-created vector store
             logger.info(f"[VECTOR_SERVICE] Performing search using existing vector store")
             vector_store = self._get_vector_store(collection_name)
@@ -265,17 +522,243 @@ class VectorService:
             logger.error(f"[VECTOR_SERVICE] Similarity search failed: {str(e)}")
             raise RuntimeError(f"Similarity search failed: {str(e)}")
 
+    def _query_cache_key(self, query: str) -> Tuple[str, bytes]:
+        """Key a query by embedding model and a hash of its normalized text."""
+        normalized = " ".join(query.casefold().split())
+        return (
+            self.embedding_tool.model,
+            hashlib.blake2b(normalized.encode(), digest_size=16).digest(),
+        )
+
+    def embed_query_cached(self, query: str) -> List[float]:
+        """
+        Sync variant of aembed_query_cached, sharing the same cache.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Query embedding
+        """
+        cache_key = self._query_cache_key(query)
+        # Runs in worker threads, so recency is left to the event loop side
+        # rather than reordering the cache concurrently with it
+        embedding = _query_embedding_cache.get(cache_key)
+        if embedding is not None:
+            return embedding
+
+        embedding = self.embeddings.embed_query(query)
+        _cache_query_embedding(cache_key, embedding)
+        return embedding
+
+    async def aembed_query_cached(self, query: str) -> List[float]:
+        """
+        Embed a search query, reusing the embedding of an identical query.
+
+        Queries are matched by embedding model and a hash of their case- and
+        space-normalized text. Concurrent calls for the same query await a
+        single embedding request.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Query embedding
+        """
+        cache_key = self._query_cache_key(query)
+        embedding = _query_embedding_cache.get(cache_key)
+        if embedding is not None:
+            _query_embedding_cache.move_to_end(cache_key)
+            return embedding
+
+        task = _query_embedding_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self.embeddings.aembed_query(query))
+            _query_embedding_inflight[cache_key] = task
+            task.add_done_callback(
+                lambda done: _finish_query_embedding(cache_key, done)
+            )
+
+        # Shielded so one cancelled request does not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def asimilarity_search_halfvec(
+        self, query: str, resource_id: UUID, k: int = 5
+    ) -> List[Document]:
+        """
+        Similarity search through the fp16 (halfvec) HNSW index.
+
+        Candidates are taken from the half-precision index, which moves half
+        the bytes of a full-precision one, and re-ranked by exact fp32
+        cosine distance.
+
+        Args:
+            query: Search query
+            resource_id: UUID
+            k: Number of results to return
+
+        Returns:
+            List of similar documents
+
+        Raises:
+            RuntimeError: If search operation fails
+        """
+        try:
+            collection_name = self.get_collection_name(resource_id)
+            query_embedding = str(await self.aembed_query_cached(query))
+
+            shared_pool = await get_shared_async_pool()
+            async with shared_pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        self._halfvec_search_query(collection_name),
+                        self._halfvec_search_params(query_embedding, k),
+                    )
+                    rows = await cursor.fetchall()
+
+            return self._rows_to_documents(rows)
+
+        except UndefinedTable:
+            logger.info(
+                f"[VECTOR_SERVICE] No documents stored yet for resource {resource_id}"
+            )
+            return []
+        except Exception as e:
+            logger.error(f"[VECTOR_SERVICE] Similarity search failed: {str(e)}")
+            raise RuntimeError(f"Similarity search failed: {str(e)}")
+
+    def similarity_search_halfvec(
+        self, query: str, resource_id: UUID, k: int = 5
+    ) -> List[Document]:
+        """
+        Sync variant of asimilarity_search_halfvec, run on the shared sync pool.
+
+        Args:
+            query: Search query
+            resource_id: UUID
+            k: Number of results to return
+
+        Returns:
+            List of similar documents
+
+        Raises:
+            RuntimeError: If search operation fails
+        """
+        try:
+            collection_name = self.get_collection_name(resource_id)
+            query_embedding = str(self.embed_query_cached(query))
+
+            with get_shared_sync_pool().connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        self._halfvec_search_query(collection_name),
+                        self._halfvec_search_params(query_embedding, k),
+                    )
+                    rows = cursor.fetchall()
+
+            return self._rows_to_documents(rows)
+
+        except UndefinedTable:
+            logger.info(
+                f"[VECTOR_SERVICE] No documents stored yet for resource {resource_id}"
+            )
+            return []
+        except Exception as e:
+            logger.error(f"[VECTOR_SERVICE] Similarity search failed: {str(e)}")
+            raise RuntimeError(f"Similarity search failed: {str(e)}")
+
+    def _halfvec_search_query(self, collection_name: str) -> sql.Composed:
+        """
+        Build the halfvec candidate search with exact fp32 re-ranking.
+
+        Args:
+            collection_name: Name of the collection/table
+
+        Returns:
+            Query taking the parameters from _halfvec_search_params
+        """
+        dimension = sql.Literal(self.embedding_tool.get_embedding_dimension())
+        return sql.SQL(
+            "SELECT langchain_id, content, langchain_metadata FROM ("
+            "SELECT langchain_id, content, langchain_metadata, embedding "
+            "FROM {table} "
+            "ORDER BY embedding::halfvec({dim}) <=> %s::halfvec({dim}) "
+            "LIMIT %s"
+            ") AS candidates "
+            "ORDER BY embedding <=> %s::vector LIMIT %s"
+        ).format(table=sql.Identifier(collection_name), dim=dimension)
+
+    def _halfvec_search_params(self, query_embedding: str, k: int) -> tuple:
+        """Parameters for _halfvec_search_query."""
+        return (query_embedding, k * HALFVEC_RERANK_FACTOR, query_embedding, k)
+
+    def _rows_to_documents(self, rows: List[Dict[str, Any]]) -> List[Document]:
+        """Build Documents from collection rows."""
+        return [
+            Document(
+                id=str(row["langchain_id"]),
+                page_content=row["content"],
+                metadata=row["langchain_metadata"] or {},
+            )
+            for row in rows
+        ]
+
     def store_documents(
         self,
         documents: List[Document],
         resource_id: UUID,
+        batch_size: int = DEFAULT_STORE_BATCH_SIZE,
     ) -> Dict[str, Any]:
         """
         Store documents in vector database.
 
+        Runs astore_documents on the shared background loop, so the write
+        goes through the shared connection pool in concurrent batches.
+
+        Args:
+            documents: List of documents to store
+            resource_id: UUID
+            batch_size: Number of documents written per vector store call
+
+        Returns:
+            Storage result with metadata
+
+        Raises:
+            RuntimeError: If storage operation fails
+        """
+        # Import here to avoid circular dependency
+        from app.ai.services.document_processing_service import run_sync
+
+        return run_sync(
+            self.astore_documents(documents, resource_id, batch_size=batch_size)
+        )
+
+    async def astore_documents(
+        self,
+        documents: List[Document],
+        resource_id: UUID,
+        embeddings: Optional[List[List[float]]] = None,
+        batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_UPSERT_CONCURRENCY,
+        ensure_table: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Store documents in vector database asynchronously.
+
+        When pre-computed embeddings are supplied the documents are not
+        re-embedded; otherwise each write batch is embedded with a single
+        embedding request. Rows are written with batched multi-row upserts,
+        one round-trip per batch, and up to max_concurrency batches are
+        embedded or written concurrently.
+
         Args:
             documents: List of documents to store
             resource_id: UUID
+            embeddings: Optional pre-computed embeddings, one per document
+            batch_size: Number of rows embedded and written per batch
+            max_concurrency: Maximum number of batches processed at once
+            ensure_table: Create the collection table if missing; callers
+                storing many batches can do this once via aensure_collection
 
         Returns:
             Storage result with metadata
@@ -284,30 +767,47 @@ class VectorService:
             RuntimeError: If storage operation fails
         """
         logger.info(
-            f"Storing documents in vector database {len(documents)}",
+            f"[VECTOR_SERVICE] Async storing {len(documents)} documents in vector database"
         )
 
         try:
+            if embeddings is not None and len(embeddings) != len(documents):
+                raise ValueError(
+                    f"Got {len(embeddings)} embeddings for {len(documents)} documents"
+                )
+
             collection_name = self.get_collection_name(resource_id)
             logger.info(f"[VECTOR_SERVICE] Using collection name: {collection_name}")
 
-            # SERVICE RESPONSIBILITY: Add metadata
-            logger.info(f"[VECTOR_SERVICE] Adding metadata to {len(documents)} documents")
             for doc in documents:
                 doc.metadata.update({"collection": collection_name})
 
-            # SERVICE RESPONSIBILITY: Store documents using pre-created vector store
-            logger.info(f"[VECTOR_SERVICE] Storing documents using existing vector store")
-            vector_store = self._get_vector_store(collection_name)
-            document_ids = vector_store.add_documents(documents)
+            if embeddings is None:
+                embeddings = await self._aembed_documents(
+                    documents, batch_size, max_concurrency
+                )
+            else:
+                logger.info(
+                    f"[VECTOR_SERVICE] Storing documents with pre-computed embeddings"
+                )
+
+            if ensure_table:
+                await self._aensure_table_exists(collection_name)
+            document_ids = await self._aupsert_embeddings(
+                collection_name,
+                documents,
+                embeddings,
+                batch_size,
+                max_concurrency,
+            )
 
-            # SERVICE RESPONSIBILITY: Create result with service-level metadata
             enhanced_result = {
                 "success": True,
                 "collection_name": collection_name,
                 "document_count": len(documents),
                 "document_ids": document_ids,
                 "embedding_model": "text-embedding-3-small",
+                "sample_embeddings": embeddings[:SAMPLE_EMBEDDING_COUNT],
             }
 
             logger.info(
@@ -322,3 +822,459 @@ class VectorService:
             raise RuntimeError(
                 f"[VECTOR_SERVICE] Failed to store documents in vector database: {str(e)}"
             )
+
+    async def _aembed_documents(
+        self,
+        documents: List[Document],
+        batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_UPSERT_CONCURRENCY,
+    ) -> List[List[float]]:
+        """
+        Embed documents with one embedding request per write batch.
+
+        Args:
+            documents: Documents to embed
+            batch_size: Number of documents per embedding request
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Embeddings aligned with documents
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def embed_batch(start: int) -> List[List[float]]:
+            texts = [doc.page_content for doc in documents[start : start + batch_size]]
+            async with semaphore:
+                return await self.embedding_tool.aembed_batch(texts)
+
+        batches = await asyncio.gather(
+            *[embed_batch(start) for start in range(0, len(documents), batch_size)]
+        )
+        return [embedding for batch in batches for embedding in batch]
+
+    async def _aupsert_embeddings(
+        self,
+        collection_name: str,
+        documents: List[Document],
+        embeddings: List[List[float]],
+        batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_UPSERT_CONCURRENCY,
+    ) -> List[str]:
+        """
+        Write documents and their embeddings with batched executemany upserts.
+
+        PGVectorStore inserts one row per statement; this collapses the write
+        into one round-trip per batch while keeping ON CONFLICT semantics.
+        Each batch commits on its own pooled connection, so up to
+        max_concurrency batches overlap their network round-trips. Ids are
+        derived from each chunk's origin, so a retry after a partial failure
+        overwrites the rows already written instead of duplicating them.
+
+        Args:
+            collection_name: Name of the collection/table
+            documents: Documents to write
+            embeddings: Embeddings aligned with documents
+            batch_size: Number of rows per executemany call
+            max_concurrency: Maximum number of batches written at once
+
+        Returns:
+            List of stored document ids
+        """
+        document_ids = self._document_ids(collection_name, documents)
+        query = self._upsert_query(collection_name)
+
+        shared_pool = await get_shared_async_pool()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def upsert_batch(start: int) -> None:
+            end = min(start + batch_size, len(documents))
+            rows = self._upsert_rows(
+                documents, document_ids, embeddings[start:end], start, end
+            )
+            async with semaphore:
+                async with shared_pool.connection() as conn:
+                    async with conn.transaction():
+                        async with conn.cursor() as cursor:
+                            await cursor.executemany(query, rows)
+            logger.info(
+                f"[VECTOR_SERVICE] Upserted batch {start // batch_size + 1} "
+                f"({end - start} rows) into {collection_name}"
+            )
+
+        await asyncio.gather(
+            *[upsert_batch(start) for start in range(0, len(documents), batch_size)]
+        )
+
+        return document_ids
+
+    def _document_ids(
+        self, collection_name: str, documents: List[Document]
+    ) -> List[str]:
+        """
+        Derive a stable id for each document.
+
+        The id is a uuid5 of the collection, the source file and the chunk
+        index (or the content hash when the chunk has no index), so storing
+        the same chunks again hits ON CONFLICT instead of adding new rows.
+        Documents that already carry an id keep it.
+
+        Args:
+            collection_name: Name of the collection/table
+            documents: Documents to derive ids for
+
+        Returns:
+            Ids aligned with documents
+        """
+        document_ids = []
+        for doc in documents:
+            if doc.id:
+                document_ids.append(doc.id)
+                continue
+            md = doc.metadata
+            source = md.get("file_key") or md.get("source") or "unknown"
+            position = md.get("chunk_index")
+            if position is None:
+                position = md.get("content_hash") or hashlib.sha256(
+                    doc.page_content.encode()
+                ).hexdigest()
+            document_ids.append(
+                str(uuid5(NAMESPACE_URL, f"{collection_name}/{source}/{position}"))
+            )
+        return document_ids
+
+    def _upsert_query(self, collection_name: str) -> sql.Composed:
+        """
+        Build the multi-row upsert statement for a collection table.
+
+        Args:
+            collection_name: Name of the collection/table
+
+        Returns:
+            INSERT ... ON CONFLICT statement taking one row per parameter tuple
+        """
+        return sql.SQL(
+            "INSERT INTO {table} (langchain_id, content, embedding, langchain_metadata) "
+            "VALUES (%s, %s, %s::vector, %s) "
+            "ON CONFLICT (langchain_id) DO UPDATE SET "
+            "content = EXCLUDED.content, "
+            "embedding = EXCLUDED.embedding, "
+            "langchain_metadata = EXCLUDED.langchain_metadata"
+        ).format(table=sql.Identifier(collection_name))
+
+    def _upsert_rows(
+        self,
+        documents: List[Document],
+        document_ids: List[str],
+        batch_embeddings: List[List[float]],
+        start: int,
+        end: int,
+    ) -> List[tuple]:
+        """
+        Build upsert parameter rows for documents[start:end].
+
+        Args:
+            documents: Documents being written
+            document_ids: Ids aligned with documents
+            batch_embeddings: Embeddings aligned with documents[start:end]
+            start: Index of the first document in the batch
+            end: Index one past the last document in the batch
+
+        Returns:
+            Parameter tuples for the upsert statement
+        """
+        return [
+            (
+                document_ids[i],
+                documents[i].page_content,
+                str(embedding),
+                Json(documents[i].metadata),
+            )
+            for i, embedding in zip(range(start, end), batch_embeddings)
+        ]
+
+    async def abulk_store_documents(
+        self,
+        documents: List[Document],
+        resource_id: UUID,
+        embeddings: Union[List[List[float]], AsyncIterator[List[List[float]]]],
+    ) -> Dict[str, Any]:
+        """
+        Bulk-load documents with pre-computed embeddings.
+
+        Streams all rows with COPY into a temporary staging table as the
+        embeddings arrive, then drops the collection's HNSW index, moves the
+        rows over in one short transaction and rebuilds the index once at the
+        end, instead of maintaining it row by row. The table is marked while
+        the index is missing so that aensure_ann_indexes can finish the build
+        after a crash.
+
+        Args:
+            documents: List of documents to store
+            resource_id: UUID
+            embeddings: Embeddings aligned with documents, either as a list or
+                as an async iterator of consecutive batches; batches are
+                written as they arrive, so they need not all be in memory
+
+        Returns:
+            Storage result with metadata
+
+        Raises:
+            RuntimeError: If storage operation fails
+        """
+        logger.info(
+            f"[VECTOR_SERVICE] Bulk storing {len(documents)} documents in vector database"
+        )
+
+        try:
+            if isinstance(embeddings, list):
+                if len(embeddings) != len(documents):
+                    raise ValueError(
+                        f"Got {len(embeddings)} embeddings for {len(documents)} documents"
+                    )
+                embedding_batches = _aiter_single(embeddings)
+            else:
+                embedding_batches = embeddings
+
+            collection_name = self.get_collection_name(resource_id)
+            await self._aensure_table_exists(collection_name)
+
+            table = sql.Identifier(collection_name)
+            document_ids = self._document_ids(collection_name, documents)
+            sample_embeddings: List[List[float]] = []
+
+            columns = sql.SQL("langchain_id, content, embedding, langchain_metadata")
+
+            shared_pool = await get_shared_async_pool()
+            async with shared_pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    # Rows are staged in a session-local table while the
+                    # embeddings arrive, so the collection is only locked for
+                    # the final copy, not for the whole embedding run
+                    await cursor.execute(
+                        sql.SQL(
+                            "CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)"
+                        ).format(staging=BULK_STAGING_TABLE, table=table)
+                    )
+                    try:
+                        logger.info(
+                            f"[VECTOR_SERVICE] Staging {len(documents)} rows for {collection_name}"
+                        )
+                        async with cursor.copy(
+                            sql.SQL("COPY {staging} ({columns}) FROM STDIN").format(
+                                staging=BULK_STAGING_TABLE, columns=columns
+                            )
+                        ) as copy:
+                            rows_written = 0
+                            async for batch_embeddings in embedding_batches:
+                                for embedding in batch_embeddings:
+                                    doc = documents[rows_written]
+                                    doc.metadata.update({"collection": collection_name})
+                                    await copy.write_row(
+                                        (
+                                            document_ids[rows_written],
+                                            doc.page_content,
+                                            str(embedding),
+                                            Json(doc.metadata),
+                                        )
+                                    )
+                                    rows_written += 1
+                                if len(sample_embeddings) < SAMPLE_EMBEDDING_COUNT:
+                                    sample_embeddings.extend(
+                                        batch_embeddings[
+                                            : SAMPLE_EMBEDDING_COUNT - len(sample_embeddings)
+                                        ]
+                                    )
+
+                        if rows_written != len(documents):
+                            raise ValueError(
+                                f"Got {rows_written} embeddings for {len(documents)} documents"
+                            )
+
+                        logger.info(
+                            f"[VECTOR_SERVICE] Copying {len(documents)} rows into {collection_name}"
+                        )
+                        async with conn.transaction():
+                            await cursor.execute(
+                                sql.SQL("DROP INDEX IF EXISTS {index}").format(
+                                    index=sql.Identifier(self.get_index_name(collection_name))
+                                )
+                            )
+                            await cursor.execute(
+                                sql.SQL("COMMENT ON TABLE {table} IS {marker}").format(
+                                    table=table, marker=sql.Literal(HNSW_PENDING_MARKER)
+                                )
+                            )
+                            await cursor.execute(
+                                sql.SQL(
+                                    "INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                                    "ON CONFLICT (langchain_id) DO UPDATE SET "
+                                    "content = EXCLUDED.content, "
+                                    "embedding = EXCLUDED.embedding, "
+                                    "langchain_metadata = EXCLUDED.langchain_metadata"
+                                ).format(
+                                    table=table, columns=columns, staging=BULK_STAGING_TABLE
+                                )
+                            )
+                    finally:
+                        # The connection goes back to the pool; don't leave the
+                        # staging table on it
+                        await cursor.execute(
+                            sql.SQL("DROP TABLE IF EXISTS {staging}").format(
+                                staging=BULK_STAGING_TABLE
+                            )
+                        )
+
+                # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+                await self._abuild_hnsw_index(conn, collection_name)
+
+            enhanced_result = {
+                "success": True,
+                "collection_name": collection_name,
+                "document_count": len(documents),
+                "document_ids": document_ids,
+                "embedding_model": "text-embedding-3-small",
+                "sample_embeddings": sample_embeddings,
+            }
+
+            logger.info(
+                f"[VECTOR_SERVICE] Successfully bulk stored {enhanced_result['document_count']} documents in vector database",
+            )
+            return enhanced_result
+
+        except Exception as e:
+            logger.error(
+                f"[VECTOR_SERVICE] Failed to bulk store documents in vector database: {str(e)}"
+            )
+            raise RuntimeError(
+                f"[VECTOR_SERVICE] Failed to bulk store documents in vector database: {str(e)}"
+            )
+
+    async def _abuild_hnsw_index(self, conn, collection_name: str) -> None:
+        """
+        Build the collection's HNSW index and clear the pending marker.
+
+        The index is an expression index over the embeddings cast to
+        halfvec, halving its size compared to indexing the fp32 column.
+
+        Args:
+            conn: Autocommit connection from the shared pool
+            collection_name: Name of the collection/table
+        """
+        index_name = self.get_index_name(collection_name)
+        logger.info(f"[VECTOR_SERVICE] Building HNSW index {index_name}")
+
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                sql.SQL(
+                    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} "
+                    "USING hnsw ((embedding::halfvec({dim})) halfvec_cosine_ops) "
+                    "WITH (m = 16, ef_construction = 64)"
+                ).format(
+                    index=sql.Identifier(index_name),
+                    table=sql.Identifier(collection_name),
+                    dim=sql.Literal(self.embedding_tool.get_embedding_dimension()),
+                )
+            )
+            await cursor.execute(
+                sql.SQL("COMMENT ON TABLE {table} IS NULL").format(
+                    table=sql.Identifier(collection_name)
+                )
+            )
+
+        logger.info(f"[VECTOR_SERVICE] HNSW index {index_name} ready")
+
+    async def aensure_ann_indexes(self) -> List[str]:
+        """
+        Build HNSW indexes that are missing or invalid.
+
+        Covers collections whose bulk load was interrupted and collection
+        tables created before the halfvec index existed.
+
+        Returns:
+            List of collection names whose index was rebuilt
+        """
+        shared_pool = await get_shared_async_pool()
+        async with shared_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                # Tables with an index build in progress belong to a bulk
+                # load that is still running, e.g. in a Celery worker
+                await cursor.execute(
+                    r"""
+                    SELECT c.relname AS table_name
+                    FROM pg_class c
+                    WHERE c.relkind = 'r'
+                    AND (
+                        obj_description(c.oid, 'pg_class') = %s
+                        OR EXISTS (
+                            SELECT 1
+                            FROM pg_index i
+                            JOIN pg_class ic ON ic.oid = i.indexrelid
+                            WHERE i.indrelid = c.oid
+                            AND NOT i.indisvalid
+                            AND ic.relname LIKE '%%\_hnsw\_idx'
+                        )
+                        OR (
+                            c.relname LIKE 'resource\_%%\_documents'
+                            AND NOT EXISTS (
+                                SELECT 1
+                                FROM pg_index i
+                                JOIN pg_class ic ON ic.oid = i.indexrelid
+                                WHERE i.indrelid = c.oid
+                                AND ic.relname = replace(c.relname, '_documents', '_hnsw_idx')
+                            )
+                        )
+                    )
+                    AND NOT EXISTS (
+                        SELECT 1
+                        FROM pg_stat_progress_create_index p
+                        WHERE p.relid = c.oid
+                    )
+                    """,
+                    (HNSW_PENDING_MARKER,),
+                )
+                rows = await cursor.fetchall()
+
+            collections = [row["table_name"] for row in rows]
+            for collection_name in collections:
+                logger.warning(
+                    f"[VECTOR_SERVICE] Building missing or invalid HNSW index: {collection_name}"
+                )
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index}").format(
+                            index=sql.Identifier(self.get_index_name(collection_name))
+                        )
+                    )
+                await self._abuild_hnsw_index(conn, collection_name)
+
+        return collections
+
+
+async def _aiter_single(
+    embeddings: List[List[float]],
+) -> AsyncIterator[List[List[float]]]:
+    """Present an in-memory embeddings list as a single streamed batch."""
+    yield embeddings
+
+
+# Global shared vector service instance
+_shared_vector_service: Optional[VectorService] = None
+
+
+def get_shared_vector_service() -> VectorService:
+    """
+    Get shared VectorService instance for the process.
+
+    Avoids rebuilding the OpenAI embeddings client and re-resolving the
+    shared engine on every request or node invocation.
+
+    Returns:
+        VectorService: Shared service instance
+    """
+    global _shared_vector_service
+
+    if _shared_vector_service is None:
+        _shared_vector_service = VectorService()
+        logger.info("[VECTOR_SERVICE] Created shared VectorService instance")
+
+    return _shared_vector_service
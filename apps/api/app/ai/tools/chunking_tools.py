@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from langchain_core.documents import Document
 from langchain_text_splitters import (
     RecursiveCharacterTextSplitter,
@@ -42,6 +42,27 @@ class TextChunkingTool:
             separators=self.language_separators["default"],
         )
 
+    def _common_chunk_metadata(
+        self, chunking_method: str, detected_language: str = None
+    ) -> dict:
+        """
+        Build the metadata fields shared by every chunk of one chunking call.
+
+        Args:
+            chunking_method: Name of the chunking strategy
+            detected_language: Detected language, if any
+
+        Returns:
+            Metadata dictionary to merge into each chunk
+        """
+        return {
+            "chunking_method": chunking_method,
+            "original_chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "detected_language": detected_language or "unknown",
+            "language_aware_chunking": detected_language is not None,
+        }
+
     def chunk_documents(
         self, documents: List[Document], detected_language: str = None
     ) -> List[Document]:
@@ -100,19 +121,14 @@ class TextChunkingTool:
             else:
                 logger.info(f"[CHUNKING_TOOL] Recursive splitter returned no chunks!")
 
-            # Add chunk metadata including language information
+            # Add chunk metadata including language information; fields shared
+            # by every chunk are built once and merged in place
+            common_metadata = self._common_chunk_metadata("recursive_character", detected_language)
             for i, chunk in enumerate(chunked_docs):
-                chunk.metadata.update(
-                    {
-                        "chunk_index": i,
-                        "chunk_size": len(chunk.page_content),
-                        "chunking_method": "recursive_character",
-                        "original_chunk_size": self.chunk_size,
-                        "chunk_overlap": self.chunk_overlap,
-                        "detected_language": detected_language or "unknown",
-                        "language_aware_chunking": detected_language is not None,
-                    }
-                )
+                md = chunk.metadata
+                md.update(common_metadata)
+                md["chunk_index"] = i
+                md["chunk_size"] = len(chunk.page_content)
 
             return chunked_docs
 
@@ -184,19 +200,14 @@ class TextChunkingTool:
             else:
                 logger.info(f"[CHUNKING_TOOL] Paragraph splitter returned no chunks!")
 
-            # Add chunk metadata including language information
+            # Add chunk metadata including language information; fields shared
+            # by every chunk are built once and merged in place
+            common_metadata = self._common_chunk_metadata("paragraph", detected_language)
             for i, chunk in enumerate(chunked_docs):
-                chunk.metadata.update(
-                    {
-                        "chunk_index": i,
-                        "chunk_size": len(chunk.page_content),
-                        "chunking_method": "paragraph",
-                        "original_chunk_size": self.chunk_size,
-                        "chunk_overlap": self.chunk_overlap,
-                        "detected_language": detected_language or "unknown",
-                        "language_aware_chunking": detected_language is not None,
-                    }
-                )
+                md = chunk.metadata
+                md.update(common_metadata)
+                md["chunk_index"] = i
+                md["chunk_size"] = len(chunk.page_content)
 
             return chunked_docs
 
@@ -253,3 +264,26 @@ class TextChunkingTool:
                 f"[CHUNKING_TOOL] Using default recursive character chunking for unknown type"
             )
             return self.chunk_documents(documents, detected_language)
+
+
+# Global shared chunking tool instance
+_shared_chunking_tool: Optional[TextChunkingTool] = None
+
+
+def get_shared_chunking_tool() -> TextChunkingTool:
+    """
+    Get the shared TextChunkingTool with default settings.
+
+    The tool's splitters hold no per-call state, so chunking nodes and
+    chains can reuse one instance instead of rebuilding them per call.
+
+    Returns:
+        TextChunkingTool: Shared tool instance
+    """
+    global _shared_chunking_tool
+
+    if _shared_chunking_tool is None:
+        _shared_chunking_tool = TextChunkingTool()
+        logger.info("[CHUNKING_TOOL] Created shared TextChunkingTool instance")
+
+    return _shared_chunking_tool
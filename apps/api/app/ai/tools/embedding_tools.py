@@ -1,10 +1,48 @@
-from typing import Any, Dict, List
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
+from openai import APIStatusError
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fragments of the provider's 400 response when a request carries too many
+# inputs or tokens; only these are retried as two smaller halves
+_BATCH_LIMIT_ERROR_MARKERS = ("tokens per request", "'$.input'")
+
+# Attempts made for a rate-limited (429) request before giving up
+RATE_LIMIT_MAX_ATTEMPTS = 5
+
+# Delay before the first rate-limit retry, doubled for each further attempt
+RATE_LIMIT_BASE_DELAY_SECONDS = 1.0
+
+
+def _should_split_batch(error: Exception, texts: List[str]) -> bool:
+    """Whether a failed embedding request exceeded the provider's batch limits."""
+    return (
+        isinstance(error, APIStatusError)
+        and error.status_code == 400
+        and len(texts) > 1
+        and any(marker in str(error) for marker in _BATCH_LIMIT_ERROR_MARKERS)
+    )
+
+
+def _rate_limit_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited request, or None to give up."""
+    if not (isinstance(error, APIStatusError) and error.status_code == 429):
+        return None
+    if attempt >= RATE_LIMIT_MAX_ATTEMPTS:
+        return None
+
+    retry_after = error.response.headers.get("retry-after")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return RATE_LIMIT_BASE_DELAY_SECONDS * 2 ** (attempt - 1)
+
 
 class EmbeddingGenerationTool:
     """Tool for generating embeddings using OpenAI models."""
@@ -46,12 +84,95 @@ class EmbeddingGenerationTool:
             if not texts:
                 return []
 
-            embeddings = self.embeddings.embed_documents(texts)
-            return embeddings
+            return self._embed_with_split(texts)
+
+        except Exception as e:
+            raise ValueError(f"Failed to generate embeddings: {str(e)}")
+
+    def _embed_with_split(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, halving the batch when the provider rejects its size."""
+        try:
+            return self._embed_with_backoff(texts)
+        except Exception as e:
+            if not _should_split_batch(e, texts):
+                raise
+            mid = len(texts) // 2
+            logger.warning(
+                f"[EMBEDDING_GENERATION] Batch of {len(texts)} over the request limit, retrying in halves"
+            )
+            return self._embed_with_split(texts[:mid]) + self._embed_with_split(
+                texts[mid:]
+            )
+
+    def _embed_with_backoff(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, retrying with exponential backoff while rate limited."""
+        attempt = 1
+        while True:
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                delay = _rate_limit_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(
+                    f"[EMBEDDING_GENERATION] Rate limited, retrying batch of {len(texts)} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Asynchronously generate embeddings for a batch of texts.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors
+
+        Raises:
+            ValueError: If embedding generation fails
+        """
+        try:
+            if not texts:
+                return []
+
+            return await self._aembed_with_split(texts)
 
         except Exception as e:
             raise ValueError(f"Failed to generate embeddings: {str(e)}")
 
+    async def _aembed_with_split(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of _embed_with_split."""
+        try:
+            return await self._aembed_with_backoff(texts)
+        except Exception as e:
+            if not _should_split_batch(e, texts):
+                raise
+            mid = len(texts) // 2
+            logger.warning(
+                f"[EMBEDDING_GENERATION] Batch of {len(texts)} over the request limit, retrying in halves"
+            )
+            return await self._aembed_with_split(
+                texts[:mid]
+            ) + await self._aembed_with_split(texts[mid:])
+
+    async def _aembed_with_backoff(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of _embed_with_backoff."""
+        attempt = 1
+        while True:
+            try:
+                return await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                delay = _rate_limit_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(
+                    f"[EMBEDDING_GENERATION] Rate limited, retrying batch of {len(texts)} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
     def generate_query_embedding(self, query: str) -> List[float]:
         """
         Generate embedding for a single query text.
@@ -88,6 +209,33 @@ class EmbeddingGenerationTool:
         return model_dimensions.get(self.model, 1536)
 
 
+# Global shared embedding tools, one per model
+_shared_embedding_tools: Dict[str, EmbeddingGenerationTool] = {}
+
+
+def get_shared_embedding_tool(
+    model: str = "text-embedding-3-small",
+) -> EmbeddingGenerationTool:
+    """
+    Get the shared EmbeddingGenerationTool for a model.
+
+    Query and document embedding then go through one OpenAI client and its
+    HTTP connection pool instead of one per service or chain.
+
+    Args:
+        model: OpenAI embedding model to use
+
+    Returns:
+        EmbeddingGenerationTool: Shared tool instance
+    """
+    tool = _shared_embedding_tools.get(model)
+    if tool is None:
+        tool = EmbeddingGenerationTool(model)
+        _shared_embedding_tools[model] = tool
+        logger.info(f"[EMBEDDING_GENERATION] Created shared embedding tool for {model}")
+    return tool
+
+
 class EmbeddingAnalysisTool:
     """Tool for analyzing and validating embeddings."""
 
@@ -95,30 +243,57 @@ class EmbeddingAnalysisTool:
         """Initialize the embedding analysis tool."""
         pass
 
-    def analyze_embedding_quality(self, embedding: List[float]) -> Dict[str, Any]:
+    def analyze_embedding_quality(
+        self, embeddings: Union[List[float], List[List[float]]]
+    ) -> Dict[str, Any]:
         """
-        Analyze the quality of an embedding vector.
+        Analyze the quality of one embedding vector or a batch of them.
+
+        All statistics are computed on a stacked float32 array; for a batch
+        the mean pairwise cosine similarity and the fraction of dimensions
+        that vary across the batch are reported as well.
 
         Args:
-            embedding: Embedding vector to analyze
+            embeddings: Embedding vector, or list of embedding vectors, to analyze
 
         Returns:
             Analysis results
         """
         try:
-            dimension = len(embedding)
-            magnitude = sum(x * x for x in embedding) ** 0.5
-            mean_value = sum(embedding) / dimension
-            variance = sum((x - mean_value) ** 2 for x in embedding) / dimension
+            arr = np.ascontiguousarray(embeddings, dtype=np.float32)
+            if arr.ndim == 1:
+                arr = arr[np.newaxis, :]
 
-            return {
+            sample_size, dimension = arr.shape
+            norms = np.linalg.norm(arr, axis=1)
+            magnitude = float(norms.mean())
+
+            analysis = {
                 "dimension": dimension,
                 "magnitude": magnitude,
-                "mean": mean_value,
-                "variance": variance,
+                "mean": float(arr.mean()),
+                "variance": float(arr.var()),
                 "quality_score": min(1.0, magnitude / dimension**0.5),
             }
 
+            if sample_size > 1:
+                safe_norms = np.where(norms == 0, 1.0, norms)
+                cos_sim = (arr @ arr.T) / np.outer(safe_norms, safe_norms)
+                off_diagonal = cos_sim.sum() - np.trace(cos_sim)
+                analysis.update(
+                    {
+                        "sample_size": sample_size,
+                        "mean_pairwise_similarity": float(
+                            off_diagonal / (sample_size * (sample_size - 1))
+                        ),
+                        "dimension_utilization": float(
+                            (arr.std(axis=0) > 1e-6).mean()
+                        ),
+                    }
+                )
+
+            return analysis
+
         except Exception as e:
             return {"error": f"Failed to analyze embedding: {str(e)}"}
 
@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from pathlib import Path
 from langchain_core.documents import Document
@@ -5,6 +7,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# pytesseract runs each OCR call as a separate tesseract process, so threads
+# are enough to use every core
+OCR_MAX_WORKERS = os.cpu_count() or 1
+
 
 class ImageExtractionTool:
     """Tool for extracting text and content from images using OCR."""
@@ -78,31 +84,46 @@ class ImageExtractionTool:
         try:
             # Try to import pytesseract
             import pytesseract
-            from PIL import Image
-
-            # Open and process image
-            image = Image.open(file_path)
-            extracted_text = pytesseract.image_to_string(image)
+            from PIL import Image, ImageSequence
+
+            # Multi-page images (e.g. TIFF) are OCR'd one frame per task
+            with Image.open(file_path) as image:
+                frames = [frame.copy() for frame in ImageSequence.Iterator(image)]
+
+            def average_confidence(frame) -> float:
+                # Get confidence data if available
+                try:
+                    data = pytesseract.image_to_data(
+                        frame, output_type=pytesseract.Output.DICT
+                    )
+                    confidences = [int(conf) for conf in data["conf"] if int(conf) > 0]
+                    return sum(confidences) / len(confidences) if confidences else 0
+                except:
+                    return 0
+
+            # Text and confidence passes for every frame run concurrently
+            with ThreadPoolExecutor(
+                max_workers=min(OCR_MAX_WORKERS, 2 * len(frames))
+            ) as executor:
+                text_futures = [
+                    executor.submit(pytesseract.image_to_string, frame)
+                    for frame in frames
+                ]
+                confidence_futures = [
+                    executor.submit(average_confidence, frame) for frame in frames
+                ]
+                texts = [future.result() for future in text_futures]
+                confidences = [future.result() for future in confidence_futures]
 
             logger.info(
-                f"[IMAGE_EXTRACTION] Extracted text from image using tesseract: {extracted_text}"
+                f"[IMAGE_EXTRACTION] Extracted text from {len(frames)} image frame(s) using tesseract"
             )
 
-            # Get confidence data if available
-            try:
-                data = pytesseract.image_to_data(
-                    image, output_type=pytesseract.Output.DICT
-                )
-                confidences = [int(conf) for conf in data["conf"] if int(conf) > 0]
-                avg_confidence = (
-                    sum(confidences) / len(confidences) if confidences else 0
-                )
-            except:
-                avg_confidence = 0
-
-            doc = Document(
-                page_content=extracted_text,
-                metadata={
+            documents = []
+            for page, (extracted_text, avg_confidence) in enumerate(
+                zip(texts, confidences)
+            ):
+                metadata = {
                     "file_type": "image",
                     "file_path": file_path,
                     "source_file": Path(file_path).name,
@@ -110,10 +131,12 @@ class ImageExtractionTool:
                     "ocr_engine": "tesseract",
                     "extracted_text": extracted_text,
                     "ocr_confidence": avg_confidence / 100.0,  # Convert to 0-1 scale
-                },
-            )
+                }
+                if len(frames) > 1:
+                    metadata["page"] = page
+                documents.append(Document(page_content=extracted_text, metadata=metadata))
 
-            return [doc]
+            return documents
 
         except ImportError:
             # Fall back to placeholder if pytesseract not available
@@ -59,8 +59,11 @@ class PDFExtractionTool:
                     output_dir_path=temp_dir,  # Use temporary directory
                 )
 
-                # Group elements by page
+                # Group elements by page, counting elements and tables in the
+                # same pass instead of rescanning all elements for every page
                 pages_content = {}
+                element_counts = {}
+                table_pages = set()
                 for element in elements:
                     # Get page number (Unstructured uses 1-based indexing)
                     page_num = getattr(element.metadata, "page_number", 1)
@@ -71,6 +74,11 @@ class PDFExtractionTool:
 
                     if page_num not in pages_content:
                         pages_content[page_num] = []
+                        element_counts[page_num] = 0
+
+                    element_counts[page_num] += 1
+                    if "table" in type(element).__name__.lower():
+                        table_pages.add(page_num)
 
                     # Add element text to page content
                     if (
@@ -94,19 +102,8 @@ class PDFExtractionTool:
                             "page_number": page_num,
                             "extraction_method": "Unstructured_Hi_Res_OCR",
                             "total_pages": len(pages_content),
-                            "has_tables": any(
-                                "table" in str(type(elem)).lower()
-                                for elem in elements
-                                if getattr(elem.metadata, "page_number", 1) == page_num
-                            ),
-                            "element_count": len(
-                                [
-                                    elem
-                                    for elem in elements
-                                    if getattr(elem.metadata, "page_number", 1)
-                                    == page_num
-                                ]
-                            ),
+                            "has_tables": page_num in table_pages,
+                            "element_count": element_counts[page_num],
                         },
                     )
                     documents.append(doc)
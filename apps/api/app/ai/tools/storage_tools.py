@@ -10,12 +10,45 @@ import os
 import tempfile
 import mimetypes
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from uuid import uuid4
 from app.services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
+# Extension fallback used when the MIME type cannot be guessed
+_EXTENSION_TYPES = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".doc": "doc",
+    ".xlsx": "xlsx",
+    ".xls": "xls",
+    ".csv": "csv",
+    ".txt": "txt",
+    ".md": "md",
+    ".jpg": "jpg",
+    ".jpeg": "jpg",
+    ".png": "png",
+    ".tiff": "tiff",
+}
+
+# File types the document processing workflow can handle
+_PROCESSABLE_TYPES = frozenset(
+    {
+        "pdf",
+        "docx",
+        "doc",
+        "jpg",
+        "png",
+        # "xlsx",
+        # "xls",
+        # "csv",
+        # "txt",
+        # "md",
+        # "tiff",
+    }
+)
+
 
 class FileStorageTool:
     """
@@ -67,16 +100,19 @@ class FileStorageTool:
                     os.unlink(temp_path)
                 raise RuntimeError(f"Failed to download file from S3: {file_key}")
 
-            # Verify file was downloaded
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+            # Verify file was downloaded (single stat for existence and size)
+            try:
+                file_size = os.stat(temp_path).st_size
+            except FileNotFoundError:
+                file_size = None
+            if not file_size:
                 logger.error(
                     f"[FILE_STORAGE_TOOL] Downloaded file is empty or missing: {temp_path}"
                 )
-                if os.path.exists(temp_path):
+                if file_size is not None:
                     os.unlink(temp_path)
                 raise RuntimeError(f"Downloaded file is empty or missing: {file_key}")
 
-            file_size = os.path.getsize(temp_path)
             logger.info(
                 f"[FILE_STORAGE_TOOL] Successfully downloaded {file_size} bytes to {temp_path}"
             )
@@ -130,6 +166,45 @@ class FileMetadataTool:
         "image/tiff": "tiff",
     }
 
+    def inspect(self, file_path: str) -> Dict[str, Any]:
+        """
+        Collect all file metadata needed for processing in one pass.
+
+        Stats the file and guesses its MIME type once, then derives file info,
+        file type, support and processing estimate from those results.
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Dictionary with file_info, file_type, is_supported and
+            processing_estimate entries
+        """
+        logger.info(f"[FILE_METADATA_TOOL] Inspecting file: {file_path}")
+
+        mime_type, _ = mimetypes.guess_type(file_path)
+        file_type = self._detect_file_type(file_path, mime_type)
+
+        try:
+            file_stat = os.stat(file_path)
+        except Exception as e:
+            logger.error(
+                f"[FILE_METADATA_TOOL] Failed to get file info for {file_path}: {str(e)}"
+            )
+            return {
+                "file_info": {"file_path": file_path, "error": str(e)},
+                "file_type": file_type,
+                "is_supported": self._is_supported_type(file_type),
+                "processing_estimate": self._fallback_estimate(e),
+            }
+
+        return {
+            "file_info": self._file_info(file_path, file_stat, mime_type),
+            "file_type": file_type,
+            "is_supported": self._is_supported_type(file_type),
+            "processing_estimate": self._estimate(file_stat.st_size, file_type),
+        }
+
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """
         Get comprehensive file information.
@@ -146,22 +221,28 @@ class FileMetadataTool:
             file_stat = os.stat(file_path)
             mime_type, _ = mimetypes.guess_type(file_path)
 
-            return {
-                "file_path": file_path,
-                "file_name": os.path.basename(file_path),
-                "file_size": file_stat.st_size,
-                "mime_type": mime_type,
-                "extension": Path(file_path).suffix.lower(),
-                "created_time": file_stat.st_ctime,
-                "modified_time": file_stat.st_mtime,
-                "is_readable": os.access(file_path, os.R_OK),
-            }
+            return self._file_info(file_path, file_stat, mime_type)
         except Exception as e:
             logger.error(
                 f"[FILE_METADATA_TOOL] Failed to get file info for {file_path}: {str(e)}"
             )
             return {"file_path": file_path, "error": str(e)}
 
+    def _file_info(
+        self, file_path: str, file_stat: os.stat_result, mime_type: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build the file info dictionary from an existing stat result."""
+        return {
+            "file_path": file_path,
+            "file_name": os.path.basename(file_path),
+            "file_size": file_stat.st_size,
+            "mime_type": mime_type,
+            "extension": Path(file_path).suffix.lower(),
+            "created_time": file_stat.st_ctime,
+            "modified_time": file_stat.st_mtime,
+            "is_readable": os.access(file_path, os.R_OK),
+        }
+
     def detect_file_type(self, file_path: str) -> str:
         """
         Detect file type from file path and content.
@@ -174,42 +255,7 @@ class FileMetadataTool:
         """
         try:
             mime_type, _ = mimetypes.guess_type(file_path)
-
-            if mime_type in self.SUPPORTED_TYPES:
-                file_type = self.SUPPORTED_TYPES[mime_type]
-                logger.info(
-                    f"[FILE_METADATA_TOOL] Detected file type: {file_type} (mime: {mime_type})"
-                )
-                return file_type
-
-            # Fallback to extension-based detection
-            extension = Path(file_path).suffix.lower()
-            extension_map = {
-                ".pdf": "pdf",
-                ".docx": "docx",
-                ".doc": "doc",
-                ".xlsx": "xlsx",
-                ".xls": "xls",
-                ".csv": "csv",
-                ".txt": "txt",
-                ".md": "md",
-                ".jpg": "jpg",
-                ".jpeg": "jpg",
-                ".png": "png",
-                ".tiff": "tiff",
-            }
-
-            if extension in extension_map:
-                file_type = extension_map[extension]
-                logger.info(
-                    f"[FILE_METADATA_TOOL] Detected file type by extension: {file_type}"
-                )
-                return file_type
-
-            logger.warning(
-                f"[FILE_METADATA_TOOL] Unknown file type for {file_path}, mime: {mime_type}"
-            )
-            return "unknown"
+            return self._detect_file_type(file_path, mime_type)
 
         except Exception as e:
             logger.error(
@@ -217,6 +263,29 @@ class FileMetadataTool:
             )
             return "unknown"
 
+    def _detect_file_type(self, file_path: str, mime_type: Optional[str]) -> str:
+        """Detect file type from an already-guessed MIME type, then extension."""
+        if mime_type in self.SUPPORTED_TYPES:
+            file_type = self.SUPPORTED_TYPES[mime_type]
+            logger.info(
+                f"[FILE_METADATA_TOOL] Detected file type: {file_type} (mime: {mime_type})"
+            )
+            return file_type
+
+        # Fallback to extension-based detection
+        extension = Path(file_path).suffix.lower()
+        if extension in _EXTENSION_TYPES:
+            file_type = _EXTENSION_TYPES[extension]
+            logger.info(
+                f"[FILE_METADATA_TOOL] Detected file type by extension: {file_type}"
+            )
+            return file_type
+
+        logger.warning(
+            f"[FILE_METADATA_TOOL] Unknown file type for {file_path}, mime: {mime_type}"
+        )
+        return "unknown"
+
     def is_supported_format(self, file_path: str) -> bool:
         """
         Check if file format is supported for processing.
@@ -227,20 +296,11 @@ class FileMetadataTool:
         Returns:
             True if format is supported, False otherwise
         """
-        file_type = self.detect_file_type(file_path)
-        supported = file_type in [
-            "pdf",
-            "docx",
-            "doc",
-            "jpg",
-            "png",
-            # "xlsx",
-            # "xls",
-            # "csv",
-            # "txt",
-            # "md",
-            # "tiff",
-        ]
+        return self._is_supported_type(self.detect_file_type(file_path))
+
+    def _is_supported_type(self, file_type: str) -> bool:
+        """Check if a detected file type is supported for processing."""
+        supported = file_type in _PROCESSABLE_TYPES
         logger.info(
             f"[FILE_METADATA_TOOL] File format supported: {supported} (type: {file_type})"
         )
@@ -260,44 +320,52 @@ class FileMetadataTool:
             file_size = os.path.getsize(file_path)
             file_type = self.detect_file_type(file_path)
 
-            # Base estimates in seconds (rough approximations)
-            base_times = {
-                "pdf": 2.0,  # 2 seconds per MB
-                "docx": 1.5,  # 1.5 seconds per MB
-                "doc": 1.5,
-                # 3 seconds per MB (complex financial analysis)
-                "xlsx": 3.0,
-                "xls": 3.5,  # 3.5 seconds per MB (legacy format overhead)
-                "csv": 2.5,  # 2.5 seconds per MB (tabular data analysis)
-                "txt": 0.5,  # 0.5 seconds per MB
-                "md": 0.5,
-                "jpg": 3.0,  # 3 seconds per MB (OCR)
-                "png": 3.0,
-                "tiff": 3.0,
-                "unknown": 5.0,  # Conservative estimate
-            }
-
-            size_mb = file_size / (1024 * 1024)
-            base_time = base_times.get(file_type, 5.0)
-            estimated_seconds = max(1.0, size_mb * base_time)
-
-            return {
-                "estimated_seconds": estimated_seconds,
-                "estimated_minutes": estimated_seconds / 60,
-                "file_size_mb": size_mb,
-                "processing_complexity": (
-                    "high"
-                    if file_type in ["jpg", "png", "tiff"]
-                    else "medium" if file_type == "pdf" else "low"
-                ),
-            }
+            return self._estimate(file_size, file_type)
 
         except Exception as e:
             logger.error(
                 f"[FILE_METADATA_TOOL] Time estimation failed for {file_path}: {str(e)}"
             )
-            return {
-                "estimated_seconds": 30.0,  # Default fallback
-                "estimated_minutes": 0.5,
-                "error": str(e),
-            }
+            return self._fallback_estimate(e)
+
+    def _estimate(self, file_size: int, file_type: str) -> Dict[str, Any]:
+        """Estimate processing time from a known file size and type."""
+        # Base estimates in seconds (rough approximations)
+        base_times = {
+            "pdf": 2.0,  # 2 seconds per MB
+            "docx": 1.5,  # 1.5 seconds per MB
+            "doc": 1.5,
+            # 3 seconds per MB (complex financial analysis)
+            "xlsx": 3.0,
+            "xls": 3.5,  # 3.5 seconds per MB (legacy format overhead)
+            "csv": 2.5,  # 2.5 seconds per MB (tabular data analysis)
+            "txt": 0.5,  # 0.5 seconds per MB
+            "md": 0.5,
+            "jpg": 3.0,  # 3 seconds per MB (OCR)
+            "png": 3.0,
+            "tiff": 3.0,
+            "unknown": 5.0,  # Conservative estimate
+        }
+
+        size_mb = file_size / (1024 * 1024)
+        base_time = base_times.get(file_type, 5.0)
+        estimated_seconds = max(1.0, size_mb * base_time)
+
+        return {
+            "estimated_seconds": estimated_seconds,
+            "estimated_minutes": estimated_seconds / 60,
+            "file_size_mb": size_mb,
+            "processing_complexity": (
+                "high"
+                if file_type in ["jpg", "png", "tiff"]
+                else "medium" if file_type == "pdf" else "low"
+            ),
+        }
+
+    def _fallback_estimate(self, error: Exception) -> Dict[str, Any]:
+        """Default estimate used when the file cannot be inspected."""
+        return {
+            "estimated_seconds": 30.0,  # Default fallback
+            "estimated_minutes": 0.5,
+            "error": str(error),
+        }
@@ -0,0 +1,46 @@
+"""
+Batch ingest workflow definition using function-based approach.
+
+Processes several files in one run so their chunks share embedding
+requests instead of each file paying its own round-trips.
+"""
+
+import logging
+from langgraph.graph import StateGraph, START, END
+from app.ai.nodes.batch_ingest_node import batch_ingest_node
+
+logger = logging.getLogger(__name__)
+
+
+def create_batch_ingest_workflow() -> StateGraph:
+    """
+    Create the batch ingest workflow.
+
+    Returns:
+        Compiled workflow taking a state with a "files" list
+    """
+    logger.info(f"[BATCH_INGEST_WORKFLOW] Creating batch ingest workflow")
+
+    workflow = StateGraph(dict)
+    workflow.add_node("batch_ingest", batch_ingest_node)
+    workflow.add_edge(START, "batch_ingest")
+    workflow.add_edge("batch_ingest", END)
+
+    return workflow.compile()
+
+
+# Create singleton workflow instance for reuse
+_batch_workflow_instance = None
+
+
+def get_batch_ingest_workflow_instance() -> StateGraph:
+    """
+    Get a singleton instance of the batch ingest workflow.
+
+    Returns:
+        Compiled workflow instance
+    """
+    global _batch_workflow_instance
+    if _batch_workflow_instance is None:
+        _batch_workflow_instance = create_batch_ingest_workflow()
+    return _batch_workflow_instance
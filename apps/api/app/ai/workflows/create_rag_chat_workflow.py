@@ -98,6 +98,10 @@ def validate_rag_chat_input(input_data: Dict[str, Any]) -> Dict[str, Any]:
     if not resource_id:
         raise ValueError("Resource ID is required")
 
+    # Nodes use the UUID as-is, so a string ID is parsed here and only here
+    if not isinstance(resource_id, UUID):
+        resource_id = UUID(str(resource_id))
+
     # Create human message as a serializable dictionary
     # This avoids JSON serialization issues with LangChain objects in the checkpointer
     human_message_dict = {
@@ -115,9 +119,8 @@ def validate_rag_chat_input(input_data: Dict[str, Any]) -> Dict[str, Any]:
     state = {
         # This will be appended to existing messages
         "messages": [human_message_dict],
-        "resource_id": str(resource_id),
+        "resource_id": resource_id,
         "resource_details": str(resource_details),
-        "context": "",  # Initialize empty context
         "answer": "",  # Initialize empty answer
     }
 
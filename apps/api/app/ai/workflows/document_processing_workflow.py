@@ -15,20 +15,31 @@ from app.ai.nodes.chunker_node import chunker_node
 from app.ai.nodes.embedder_node import embedder_node
 from app.ai.nodes.document_router_node import document_router_node
 from app.ai.nodes.file_fetcher_node import file_fetcher_node
+from app.ai.workflows.streaming_ingest_workflow import streaming_ingest_graph
+from app.ai.schemas.workflow_states import (
+    DocumentProcessingGraphState,
+    ProcessingRoute,
+    ProcessingStatus,
+)
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def create_document_processing_workflow() -> StateGraph:
+def create_document_processing_workflow(embed: bool = True) -> StateGraph:
     """
     Create document processing workflow for document processing functionality.
+
+    Args:
+        embed: Whether to embed and store chunks; when False the workflow ends
+            after chunking so several files can be embedded together
     """
 
     logger.info(f"[DOCUMENT_PROCESSING_WORKFLOW] Creating document processing workflow")
 
-    # Create the state graph with dict for flexibility while maintaining validation
-    # We'll validate state using DocumentProcessingState schema in the service layer
-    workflow = StateGraph(dict)
+    # Keyed channels let nodes return partial updates; the state itself is
+    # validated with the DocumentProcessingState schema in the service layer
+    workflow = StateGraph(DocumentProcessingGraphState)
 
     # Add nodes
     workflow.add_node("file_fetcher", file_fetcher_node)
@@ -36,8 +47,14 @@ def create_document_processing_workflow() -> StateGraph:
     workflow.add_node("pdf_processor", pdf_processor_node)
     workflow.add_node("docx_processor", docx_processor_node)
     workflow.add_node("image_processor", image_processor_node)
-    workflow.add_node("chunker", chunker_node)
-    workflow.add_node("embedder", embedder_node)
+    streaming = embed and settings.STREAMING_INGEST
+    if streaming:
+        # Chunking and embedding overlap inside a single pipelined subgraph
+        workflow.add_node("ingest", streaming_ingest_graph)
+    else:
+        workflow.add_node("chunker", chunker_node)
+        if embed:
+            workflow.add_node("embedder", embedder_node)
     workflow.add_node("error_handler", error_handler_node)
 
     # Set entry point
@@ -62,16 +79,22 @@ def create_document_processing_workflow() -> StateGraph:
         },
     )
 
-    # All processors go to chunker
-    workflow.add_edge("pdf_processor", "chunker")
-    workflow.add_edge("docx_processor", "chunker")
-    workflow.add_edge("image_processor", "chunker")
-
-    # Chunker goes to embedder
-    workflow.add_edge("chunker", "embedder")
+    # All processors go to chunker (or the streaming ingest subgraph)
+    ingest_entry = "ingest" if streaming else "chunker"
+    workflow.add_edge("pdf_processor", ingest_entry)
+    workflow.add_edge("docx_processor", ingest_entry)
+    workflow.add_edge("image_processor", ingest_entry)
+
+    if streaming:
+        workflow.add_edge("ingest", END)
+    elif embed:
+        # Chunker goes to embedder
+        workflow.add_edge("chunker", "embedder")
+        workflow.add_edge("embedder", END)
+    else:
+        workflow.add_edge("chunker", END)
 
     # Final Steps
-    workflow.add_edge("embedder", END)
     workflow.add_edge("error_handler", END)
 
     # Compile the workflow
@@ -97,16 +120,19 @@ def route_after_analysis(
     Returns:
         Next node name
     """
-    status = state.get("status", "pending")
+    status = state.get("status", ProcessingStatus.PENDING)
     file_path = state.get("file_path")
-    processing_route = state.get("processing_route", "unsupported")
+    processing_route = state.get("processing_route", ProcessingRoute.UNSUPPORTED)
 
     logger.info(
         f"[DOCUMENT_PROCESSING_WORKFLOW] Routing decision for processing_route={processing_route} (status={status})"
     )
 
     # If there's an error or unsupported file, go to error handler
-    if status == "failed" or processing_route == "unsupported":
+    if (
+        status == ProcessingStatus.FAILED
+        or processing_route == ProcessingRoute.UNSUPPORTED
+    ):
         logger.info(
             f"[DOCUMENT_PROCESSING_WORKFLOW] Routing to error_handler for route {processing_route} (status={status})"
         )
@@ -114,9 +140,9 @@ def route_after_analysis(
 
     # Route to appropriate processor
     route_mapping = {
-        "pdf": "pdf_processor",
-        "docx": "docx_processor",
-        "image": "image_processor",
+        ProcessingRoute.PDF: "pdf_processor",
+        ProcessingRoute.DOCX: "docx_processor",
+        ProcessingRoute.IMAGE: "image_processor",
     }
 
     next_node = route_mapping.get(processing_route, "error_handler")
@@ -137,7 +163,7 @@ def check_file_fetcher_status(state: Dict[str, Any]) -> str:
     Returns:
         Next node name based on file fetcher status
     """
-    status = state.get("status", "pending")
+    status = state.get("status", ProcessingStatus.PENDING)
     file_path = state.get("file_path")
 
     logger.info(
@@ -146,7 +172,7 @@ def check_file_fetcher_status(state: Dict[str, Any]) -> str:
     logger.info(f"[DOCUMENT_PROCESSING_WORKFLOW] Status from file fetcher: {status}")
 
     # If file fetching failed or no file path was set, go to error handler
-    if status == "failed" or not file_path:
+    if status == ProcessingStatus.FAILED or not file_path:
         return "error_handler"
 
     # If successful, continue to document router
@@ -164,7 +190,7 @@ def error_handler_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current workflow state
 
     Returns:
-        Updated state with error handling
+        State updates with error handling
     """
 
     try:
@@ -176,30 +202,27 @@ def error_handler_node(state: Dict[str, Any]) -> Dict[str, Any]:
         # Create appropriate error response
         if not is_supported_format:
             final_message = f"File type not supported for AI processing: {file_format}"
-            final_status = "skipped"
+            final_status = ProcessingStatus.SKIPPED
         else:
             final_message = f"Processing failed: {error_message}"
-            final_status = "failed"
+            final_status = ProcessingStatus.FAILED
 
-        # Update state for final result
-        updated_state = {
-            **state,
+        # Only the final status and message change
+        return {
             "status": final_status,
             "error_message": final_message,
         }
 
-        return updated_state
-
     except Exception as e:
         return {
-            **state,
-            "status": "failed",
+            "status": ProcessingStatus.FAILED,
             "error_message": f"Error handler failed: {str(e)}",
         }
 
 
-# Create a singleton workflow instance for reuse
+# Create singleton workflow instances for reuse
 _workflow_instance = None
+_preparation_workflow_instance = None
 
 
 def get_document_processing_workflow_instance() -> StateGraph:
@@ -213,3 +236,19 @@ def get_document_processing_workflow_instance() -> StateGraph:
     if _workflow_instance is None:
         _workflow_instance = create_document_processing_workflow()
     return _workflow_instance
+
+
+def get_document_preparation_workflow_instance() -> StateGraph:
+    """
+    Get a singleton instance of the document processing workflow without the
+    embedding stage.
+
+    Returns:
+        Compiled workflow instance that stops after chunking
+    """
+    global _preparation_workflow_instance
+    if _preparation_workflow_instance is None:
+        _preparation_workflow_instance = create_document_processing_workflow(
+            embed=False
+        )
+    return _preparation_workflow_instance
@@ -0,0 +1,35 @@
+"""
+Streaming ingest subgraph definition using function-based approach.
+
+Replaces the linear chunker -> embedder pair with a single pipelined node
+so chunking, embedding and storage overlap.
+"""
+
+import logging
+from langgraph.graph import StateGraph, START, END
+from app.ai.nodes.streaming_ingest_node import streaming_ingest_node
+from app.ai.schemas.workflow_states import DocumentProcessingGraphState
+
+logger = logging.getLogger(__name__)
+
+
+def create_streaming_ingest_graph() -> StateGraph:
+    """
+    Create the streaming ingest subgraph.
+
+    Returns:
+        Compiled subgraph that can be added as a node of a parent workflow
+    """
+    logger.info(f"[STREAMING_INGEST_WORKFLOW] Creating streaming ingest subgraph")
+
+    # Same channels as the parent graph so updates map key for key
+    workflow = StateGraph(DocumentProcessingGraphState)
+    workflow.add_node("streaming_ingest", streaming_ingest_node)
+    workflow.add_edge(START, "streaming_ingest")
+    workflow.add_edge("streaming_ingest", END)
+
+    return workflow.compile()
+
+
+# Compiled once at import; the subgraph holds no per-run state
+streaming_ingest_graph = create_streaming_ingest_graph()
@@ -52,6 +52,9 @@ class Settings(BaseSettings):
     # Model
     MODEL: str = os.getenv("MODEL", "gpt-4o-mini")
 
+    # Ingestion: pipeline chunking/embedding/storage instead of running them in sequence
+    STREAMING_INGEST: bool = os.getenv("STREAMING_INGEST", "false").lower() == "true"
+
     class Config:
         case_sensitive = True
         env_file = "apps/api/.env"
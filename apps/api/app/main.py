@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -43,6 +44,51 @@ def create_application() -> FastAPI:
         logger.info(f"Debug mode: {settings.DEBUG}")
         logger.info(f"Log level: {settings.LOG_LEVEL}")
 
+        # Share a single VectorService across requests
+        try:
+            from app.ai.services.vector_service import get_shared_vector_service
+
+            app.state.vector_service = get_shared_vector_service()
+        except Exception as e:
+            logger.error(f"Could not initialize VectorService: {str(e)}")
+            return
+
+        # Build HNSW indexes missing from older collections or left unfinished
+        # by a crash during bulk ingestion; builds can take minutes, so
+        # requests are served meanwhile
+        async def ensure_ann_indexes():
+            try:
+                rebuilt = await app.state.vector_service.aensure_ann_indexes()
+                if rebuilt:
+                    logger.info(f"Rebuilt HNSW indexes for: {', '.join(rebuilt)}")
+            except Exception as e:
+                logger.error(f"Could not verify HNSW indexes: {str(e)}")
+
+        # Referenced on app.state so the task is not garbage collected
+        app.state.ann_index_task = asyncio.create_task(ensure_ann_indexes())
+
+        # Drop embedding cache entries that have gone unused for a long time
+        async def prune_embedding_cache():
+            try:
+                from app.ai.services.embedding_cache_service import (
+                    EmbeddingCacheService,
+                )
+
+                await EmbeddingCacheService.aprune()
+            except Exception as e:
+                logger.error(f"Could not prune embedding cache: {str(e)}")
+
+        app.state.embedding_cache_prune_task = asyncio.create_task(
+            prune_embedding_cache()
+        )
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        # Let background chat checkpoint writes land before the process exits
+        from app.ai.services.chat_service import drain_pending_writes
+
+        await drain_pending_writes()
+
     @app.get("/")
     async def root():
         return {
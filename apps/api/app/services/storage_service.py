@@ -68,24 +68,25 @@ class StorageService:
             HTTPException: If download fails
         """
         try:
-            # Check if file exists in S3
-            if not self.file_exists(file_key):
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"File not found in S3: {file_key}",
-                )
-
             # Create directory if it doesn't exist
             dir_name = os.path.dirname(local_path)
             if dir_name:
                 os.makedirs(dir_name, exist_ok=True)
 
-            # Download the file
+            # Download the file; a missing key surfaces as a 404 from the
+            # transfer's own HEAD request, so no separate existence check
             self.s3.download_file(self.bucket_name, file_key, local_path)
             return local_path
-        except HTTPException:
-            # Re-raise HTTP exceptions as-is
-            raise
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"File not found in S3: {file_key}",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to download file from S3: {str(e)}",
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -7,6 +7,8 @@ and sets up task routing and concurrency controls following Celery 5.5.3 best pr
 
 # Load environment variables FIRST, before any other imports
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
+import gc
 import os
 from dotenv import load_dotenv
 import ssl
@@ -72,7 +74,11 @@ class Config:
         "process_document_task": {
             "queue": "document_processing",
             "routing_key": "document_processing",
-        }
+        },
+        "process_documents_batch_task": {
+            "queue": "document_processing",
+            "routing_key": "document_processing",
+        },
     }
 
 
@@ -84,5 +90,28 @@ celery_app = Celery(
 # Apply configuration
 celery_app.config_from_object(Config)
 
+
+@worker_init.connect
+def build_state_schemas(**kwargs):
+    """Build deferred Pydantic schemas before the pool forks.
+
+    DocumentProcessingState defers its schema build so the API process never
+    pays for it; workers build it here once so forked children inherit it
+    instead of compiling it on their first task.
+    """
+    from app.ai.schemas.workflow_states import (
+        DocumentProcessingState,
+        DocumentProcessingStateList,
+    )
+
+    DocumentProcessingState.model_rebuild(force=True)
+    DocumentProcessingStateList.rebuild(force=True)
+
+
+@worker_process_init.connect
+def freeze_startup_objects(**kwargs):
+    """Move objects loaded at worker start-up out of future GC passes."""
+    gc.freeze()
+
 if __name__ == "__main__":
     celery_app.start()
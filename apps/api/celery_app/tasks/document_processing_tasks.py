@@ -10,6 +10,7 @@ import logging
 import gc
 import psutil
 import os
+from typing import List
 from uuid import UUID
 from celery_app.celery import celery_app
 from app.factories.service_factory import create_document_processing_service
@@ -174,6 +175,80 @@ def process_document_task(self, resource_id: str, user_id: str, file_key: str):
         return error_info
 
 
+@celery_app.task(
+    bind=True,
+    name="process_documents_batch_task",
+    soft_time_limit=1800,  # 30 minutes soft limit
+    time_limit=2100,  # 35 minutes hard limit
+)
+def process_documents_batch_task(self, items: List[List[str]]):
+    """
+    Celery task for processing several documents in one workflow run.
+
+    The files' chunks are embedded together, amortizing per-file embedding
+    and database round-trips. Not retried automatically: a retry would
+    reprocess every file in the batch.
+
+    Args:
+        items: [resource_id, user_id, file_key] string triples
+
+    Returns:
+        Dictionary with one processing result per file
+    """
+    start_time = time.time()
+    task_id = self.request.id
+
+    logger.info(
+        f"[CELERY_TASK] Starting batch document processing task {task_id} for {len(items)} files"
+    )
+    log_memory_usage("Batch Task Start")
+
+    try:
+        document_processing_service = create_document_processing_service()
+
+        results = document_processing_service.process_documents_sync(
+            [
+                (UUID(resource_id), UUID(user_id), str(file_key))
+                for resource_id, user_id, file_key in items
+            ]
+        )
+
+        log_memory_usage("After Batch Workflow")
+        force_garbage_collection()
+
+        duration = time.time() - start_time
+        logger.info(
+            f"[CELERY_TASK] Batch document processing completed in {duration:.2f}s for {len(items)} files"
+        )
+
+        return {
+            "file_keys": [file_key for _, _, file_key in items],
+            "status": "completed",
+            "results": results,
+            "duration": duration,
+            "task_id": task_id,
+            "completed_at": time.time(),
+        }
+
+    except Exception as exc:
+        duration = time.time() - start_time
+        logger.error(
+            f"[CELERY_TASK] Batch document processing failed after {duration:.2f}s: {str(exc)}"
+        )
+        force_garbage_collection()
+
+        # Return the error info to avoid serialization issues in the result backend
+        return {
+            "file_keys": [file_key for _, _, file_key in items],
+            "error": str(exc),
+            "error_type": type(exc).__name__,
+            "duration": duration,
+            "task_id": task_id,
+            "failed_at": time.time(),
+            "status": "failed",
+        }
+
+
 @celery_app.task(bind=True, name="health_check_task")
 def health_check_task(self):
     """